@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Generic, Hashable, TypeVar
+
+# Small in-memory caches shared by the cogs.
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A mapping whose entries expire a fixed number of seconds after they were set.
+
+    Parameters
+    ----------
+    ttl : float
+        How long an entry lives, in seconds.
+    """
+
+    _swept_size: int = 64
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._data: dict[K, tuple[float, V]] = {}
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires <= monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None):
+        self._data[key] = (monotonic() + (self.ttl if ttl is None else ttl), value)
+        # Expired entries are only ever dropped lazily, sweep them once the cache doubles.
+        if len(self._data) > 2 * self._swept_size:
+            self.expire()
+
+    def pop(self, key: K):
+        self._data.pop(key, None)
+
+    def expire(self):
+        now = monotonic()
+        self._data = {k: v for k, v in self._data.items() if v[0] > now}
+        self._swept_size = max(len(self._data), 64)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A mapping holding at most `maxsize` entries, evicting the least recently used one.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of entries.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K):
+        self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
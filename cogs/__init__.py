@@ -1 +1 @@
-default = ["help", "ctf", "config", "cipher", "utility", "ctftime","ctftime_scheduler"]
+default = ["help", "ctf", "config", "cipher", "utility", "ctftime","ctftime_scheduler","reminders"]
@@ -1,8 +1,13 @@
+from dataclasses import fields
+from datetime import UTC, datetime
+from typing import Any
+
 import discord
 from discord.ext import commands
 
-import config_vars
+import database
 from common import Context
+from cron import CronSchedule
 
 # Extension for per-discord-server configuration.
 # Configurations are logged in the database under the server id (right click on your server icon in discord dev mode).
@@ -17,6 +22,10 @@ class Config(commands.Cog):
         super().__init__()
         self.bot = bot
 
+    async def cog_load(self):
+        await database.guild_configs.ensure_indexes()
+        await database.guild_configs.prefetch([guild.id for guild in self.bot.guilds])
+
     @commands.group()
     async def config(self, ctx: Context):
         """
@@ -56,18 +65,12 @@ class Config(commands.Cog):
         if (
             category == None
         ):  # Checks if category exists, if it doesn't it will create it.
-            await ctx.guild.create_category(name=category_name)
-            category = discord.utils.get(ctx.guild.categories, name=category_name)
-
-        sconf = config_vars.serverdb[
-            str(ctx.guild.id) + "-CONF"
-        ]  # sconf means server configuration
-        info = {"ctf_category": category_name}
-        sconf.update_one({"name": "category_name"}, {"$set": info}, upsert=True)
-        categoryset = sconf.find_one({"name": "category_name"})
-        if categoryset is None:
-            raise ValueError("CTF category not set")
-        await ctx.send(f"CTF category set as `{categoryset['ctf_category']}`")
+            category = await ctx.guild.create_category(name=category_name)
+
+        info = {"ctf_category": category_name, "ctf_category_id": category.id}
+        await database.guild_configs.set(ctx.guild.id, info)
+        conf = await database.guild_configs.get(ctx.guild.id)
+        await ctx.send(f"CTF category set as `{conf.ctf_category}`")
 
     @commands.bot_has_permissions(manage_channels=True)
     @commands.has_permissions(manage_channels=True)
@@ -93,18 +96,119 @@ class Config(commands.Cog):
         if (
             category == None
         ):  # Checks if category exists, if it doesn't it will create it.
-            await ctx.guild.create_category(name=category_name)
-            category = discord.utils.get(ctx.guild.categories, name=category_name)
-
-        sconf = config_vars.serverdb[
-            str(ctx.guild.id) + "-CONF"
-        ]  # sconf means server configuration
-        info = {"archive_category": category_name}
-        sconf.update_one({"name": "archive_category_name"}, {"$set": info}, upsert=True)
-        categoryset = sconf.find_one({"name": "archive_category_name"})
-        if categoryset is None:
-            raise ValueError("Archive category not set")
-        await ctx.send(f"Archive category set as `{categoryset['archive_category']}`")
+            category = await ctx.guild.create_category(name=category_name)
+
+        info = {"archive_category": category_name, "archive_category_id": category.id}
+        await database.guild_configs.set(ctx.guild.id, info)
+        conf = await database.guild_configs.get(ctx.guild.id)
+        await ctx.send(f"Archive category set as `{conf.archive_category}`")
+
+    @commands.has_permissions(manage_channels=True)
+    @commands.guild_only()
+    @config.command()
+    async def announcements(
+        self,
+        ctx: Context,
+        channel: discord.TextChannel | None = None,
+        role: discord.Role | None = None,
+    ):
+        """
+        send the weekly upcoming CTFs to a channel, leave out the channel to stop them.
+
+        Parameters
+        ----------
+        channel : discord.TextChannel
+            The channel the announcements are sent to
+        role : discord.Role
+            The role mentioned in the announcements
+        """
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage
+
+        info: dict[str, Any] = {
+            "announce_channel_id": channel.id if channel else None,
+            "announce_role_id": role.id if role else None,
+            # Start counting from now, runs from before the change were not missed.
+            "announce_last_run": datetime.now(UTC),
+        }
+        await database.guild_configs.set(ctx.guild.id, info)
+        self.bot.dispatch("announcement_schedule_changed", ctx.guild.id)
+        if channel is None:
+            await ctx.send("Announcements stopped")
+        else:
+            await ctx.send(f"Announcements will be sent to {channel.mention}")
+
+    @commands.has_permissions(manage_channels=True)
+    @commands.guild_only()
+    @config.command()
+    async def announcement_schedule(
+        self, ctx: Context, cron: str = "0 18 * * 5", timezone: str = "Asia/Kolkata"
+    ):
+        """
+        specify when announcements are sent as a cron expression, defaults to "0 18 * * 5" (Fridays at 18:00) in Asia/Kolkata.
+
+        Parameters
+        ----------
+        cron : str
+            The cron expression (minute hour day-of-month month day-of-week)
+        timezone : str
+            The timezone of the expression, e.g. "Europe/London"
+        """
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage
+
+        now = datetime.now(UTC)
+        try:
+            schedule = CronSchedule(cron, timezone)
+            # Also rejects expressions that never fire, e.g. "0 0 31 2 *".
+            next_fire = int(schedule.next_fire(now).timestamp())
+        except ValueError as e:
+            raise commands.BadArgument(str(e))
+        # Only runs of the new schedule count as missed, so count them from now.
+        await database.guild_configs.set(
+            ctx.guild.id,
+            {
+                "announce_cron": cron,
+                "announce_timezone": timezone,
+                "announce_last_run": now,
+            },
+        )
+        self.bot.dispatch("announcement_schedule_changed", ctx.guild.id)
+        await ctx.send(f"Announcement schedule set, the next one is <t:{next_fire}:F>")
+
+    @commands.guild_only()
+    @config.command(aliases=["list", "ls"])
+    async def show(self, ctx: Context):
+        """
+        show the current configuration of this server.
+        """
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage
+
+        conf = await database.guild_configs.get(ctx.guild.id)
+        channel = (
+            ctx.guild.get_channel(conf.announce_channel_id)
+            if conf.announce_channel_id
+            else None
+        )
+        role = (
+            ctx.guild.get_role(conf.announce_role_id) if conf.announce_role_id else None
+        )
+        shown: dict[str, object] = {}
+        for field in fields(conf):
+            # Mentions don't render in a code block, so the announcement channel and role are
+            # shown by name (or id, if they were deleted). The other ids are internal, the
+            # categories are shown by name.
+            if field.name == "announce_channel_id":
+                shown["announce_channel"] = (
+                    f"#{channel}" if channel else conf.announce_channel_id
+                )
+            elif field.name == "announce_role_id":
+                shown["announce_role"] = f"@{role}" if role else conf.announce_role_id
+            elif not field.name.endswith("_id"):
+                shown[field.name] = getattr(conf, field.name)
+        settings = "\n".join(f"[{name}]: {value}" for name, value in shown.items())
+        await ctx.send(f"```ini\n{settings}```")
 
 
 async def setup(bot: commands.Bot):
@@ -1,25 +1,43 @@
+import re
 import string
 import traceback
+from typing import Iterable, Iterator
 
+import aiohttp
 import discord
-import requests
 from discord.ext import commands
 
-from common import Context
-from config_vars import serverdb, teamdb
+import database
+import providers
+from cache import LRUCache
+from cogs.help import PaginationView
+from common import CTFT, Context, EmbedData, NullCTFBot
+from fuzzy import NameIndex
+from providers import (
+    Credentials,
+    InvalidCredentials,
+    InvalidProvider,
+    NonceNotFound,
+    PullFailed,
+)
 
 # All commands relating to server specific CTF data
-# Credentials provided for pulling challenges from the CTFd platform are NOT stored in the database.
+# Credentials provided for pulling challenges from CTF platforms are NOT stored in the database.
 # they are stored in a pinned message in the discord channel.
 
 
+# Channel ids of every ctf channel, warmed when the cog loads and kept current by create/delete
+# and the channel gateway events, so in_ctf_channel never has to ask the database.
+active_ctf_channels: set[int] = set()
+
+
 def in_ctf_channel():
     async def tocheck(ctx: Context):
         if ctx.guild is None:
             raise commands.NoPrivateMessage
 
         # A check for ctf context specific commands
-        if teamdb[str(ctx.guild.id)].find_one({"name": str(ctx.message.channel)}):
+        if ctx.channel.id in active_ctf_channels:
             return True
         else:
             await ctx.send("You must be in a created ctf channel to use ctf commands!")
@@ -28,115 +46,308 @@ def in_ctf_channel():
     return commands.check(tocheck)
 
 
+async def fetch_ctf(ctx: Context) -> CTFT | None:
+    # The ctf document of the current channel, read at most once per command and handed
+    # to every check and subcommand of the invocation through the context.
+    if ctx.guild is None:
+        raise commands.NoPrivateMessage
+    if not hasattr(ctx, "ctf"):
+        setattr(ctx, "ctf", await database.teams.find(ctx.guild.id, ctx.channel.id))
+    return getattr(ctx, "ctf")
+
+
+async def ctf_role(ctx: Context) -> discord.Role | None:
+    # The role of the current ctf by its stored id. ctfs created before ids were stored only
+    # have a role of the same name as the channel, which is looked up once and backfilled.
+    if ctx.guild is None:
+        raise commands.NoPrivateMessage
+    ctf = await fetch_ctf(ctx)
+    role_id = ctf.get("role_id") if ctf else None
+    role = ctx.guild.get_role(role_id) if role_id else None
+    if role is None:
+        role = discord.utils.get(ctx.guild.roles, name=str(ctx.message.channel))
+        if role is not None and ctf is not None:
+            await database.teams.update(
+                ctx.guild.id, ctx.channel.id, {"role_id": role.id}
+            )
+    return role
+
+
+async def get_category(
+    guild: discord.Guild, name: str, category_id: int | None, config_key: str
+) -> discord.CategoryChannel:
+    # The configured category by its cached id, falling back to a name search (and creating
+    # it if it doesn't exist), after which the id is saved to the guild config under config_key.
+    category = guild.get_channel(category_id) if category_id else None
+    if isinstance(category, discord.CategoryChannel) and category.name == name:
+        return category
+    category = discord.utils.get(guild.categories, name=name)
+    if category is None:  # Checks if category exists, if it doesn't it will create it.
+        category = await guild.create_category(name=name)
+    await database.guild_configs.set(guild.id, {config_key: category.id})
+    return category
+
+
 def strip_string(tostrip: str, whitelist: list[str] | set[str]):
     # A string validator to correspond with a provided whitelist.
     stripped = "".join([ch for ch in tostrip if ch in whitelist])
     return stripped.strip()
 
 
-class InvalidProvider(Exception):
-    pass
+# Characters allowed in a challenge name. Notably excludes "." and "$", so a name is always
+# safe to use as a field path inside the challenges document.
+CHALLENGE_WHITELIST = set(
+    string.ascii_letters
+    + string.digits
+    + " "
+    + "-"
+    + "!"
+    + "#"
+    + "_"
+    + "["
+    + "]"
+    + "("
+    + ")"
+    + "?"
+    + "@"
+    + "+"
+    + "<"
+    + ">"
+)
+
+
+# Fuzzy indexes of the challenge names of recently used ctfs, by (guild id, channel id).
+# An index is dropped on every write to its challenges and rebuilt on the next lookup.
+challenge_indexes: LRUCache[tuple[int, int], NameIndex] = LRUCache(256)
+
+
+def invalidate_challenges(guild_id: int, channel_id: int):
+    challenge_indexes.pop((guild_id, channel_id))
+
+
+async def challenge_index(ctx: Context) -> NameIndex:
+    if ctx.guild is None:
+        raise commands.NoPrivateMessage
+    key = (ctx.guild.id, ctx.channel.id)
+    index = challenge_indexes.get(key)
+    if index is None:
+        ctf = await fetch_ctf(ctx)
+        index = NameIndex(ctf.get("challenges", {}) if ctf else [])
+        challenge_indexes.set(key, index)
+    return index
+
+
+class ChallengeChoice(discord.ui.View):
+    """
+    Buttons for the author of a command to pick the challenge an ambiguous name meant.
+
+    Parameters
+    ----------
+    author : discord.abc.User
+        The only user allowed to choose.
+    typed : str
+        The name as it was typed.
+    candidates : list[str]
+        The challenges it could mean.
+    allow_typed : bool
+        Whether the typed name can be used as is (as a new challenge).
+    """
 
+    def __init__(
+        self,
+        author: discord.abc.User,
+        typed: str,
+        candidates: list[str],
+        allow_typed: bool,
+    ):
+        super().__init__(timeout=60)
+        self.author = author
+        self.choice: str | None = None
+        for name in candidates:
+            self.add_choice(name[:80], name, discord.ButtonStyle.primary)
+        if allow_typed:
+            self.add_choice(f'Add "{typed}"'[:80], typed, discord.ButtonStyle.secondary)
+        self.add_choice("None of these", None, discord.ButtonStyle.danger)
+
+    def add_choice(self, label: str, value: str | None, style: discord.ButtonStyle):
+        button: discord.ui.Button[ChallengeChoice] = discord.ui.Button(
+            label=label, style=style
+        )
 
-class InvalidCredentials(Exception):
-    pass
+        async def callback(interaction: discord.Interaction):
+            self.choice = value
+            await interaction.response.edit_message(view=None)
+            self.stop()
+
+        button.callback = callback
+        self.add_item(button)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author.id
+
+
+async def resolve_challenges(
+    ctx: Context, names: list[str], keep_unknown: bool
+) -> tuple[list[str], list[str]]:
+    # Resolve typed names to the existing challenges they most likely mean, asking the author
+    # when several are about as likely. Returns the resolved names and the ones matching no
+    # challenge (these are resolved as typed instead when keep_unknown is set).
+    index = await challenge_index(ctx)
+    resolved: list[str] = []
+    unknown: list[str] = []
+    for name in names:
+        match, candidates = index.match(name)
+        if match is None and candidates:
+            view = ChallengeChoice(ctx.author, name, candidates, keep_unknown)
+            message = await ctx.send(f"Which challenge is `{name}`?", view=view)
+            if await view.wait() or view.choice is None:  # timed out or none of these
+                await message.edit(content=f"Skipped `{name}`", view=None)
+                continue
+            match = view.choice
+        if match is not None:
+            resolved.append(match)
+        elif keep_unknown:
+            resolved.append(name)
+        else:
+            unknown.append(name)
+    return [*dict.fromkeys(resolved)], unknown
+
+
+# A code block in a message, its contents being everything between the backticks except a
+# language tag on the opening line (```txt), which Discord doesn't show either.
+CODE_BLOCK = re.compile(r"```(?:[\w+-]*\n)?(.*?)```", re.DOTALL)
+# The largest attached text file read for challenge names.
+MAX_NAMES_ATTACHMENT = 1024 * 1024
+
+
+async def challenge_names(ctx: Context, names: Iterable[str]) -> list[str]:
+    # The challenge names given to a command, one per argument, or one per line of a code block
+    # in the message or of attached text files. They are stripped to the whitelist, and empty
+    # names and duplicates are dropped.
+    block = CODE_BLOCK.search(ctx.message.content)
+    lines: list[str] = block.group(1).splitlines() if block else [*names]
+    for attachment in ctx.message.attachments:
+        is_text = (attachment.content_type or "").startswith("text/")
+        if (is_text or attachment.filename.endswith(".txt")) and (
+            attachment.size <= MAX_NAMES_ATTACHMENT
+        ):
+            lines += (await attachment.read()).decode(errors="replace").splitlines()
+    stripped = (strip_string(str(name), CHALLENGE_WHITELIST) for name in lines)
+    result = [*dict.fromkeys(name for name in stripped if name)]
+    if not result:
+        raise commands.BadArgument("Invalid challenge name")
+    return result
+
+
+def name_list(names: list[str], limit: int = 1500) -> str:
+    # "`a`, `b` and `c`", cut short to fit in a message.
+    shown: list[str] = []
+    size = 0
+    for name in names:
+        size += len(name) + 4
+        if size > limit:
+            break
+        shown.append(f"`{name}`")
+    if len(shown) < len(names):
+        return f"{', '.join(shown)} and {len(names) - len(shown)} more"
+    if len(shown) == 1:
+        return shown[0]
+    return f"{', '.join(shown[:-1])} and {shown[-1]}"
+
+
+# Statuses `challenge list` can filter on, a filter matches the statuses starting with it.
+CHALLENGE_STATUSES = ("unsolved", "solved", "working")
+
+
+def challenge_category(name: str) -> str:
+    # Challenges pulled from a CTF platform are named "<category> name".
+    return name[1 : name.find(">")].casefold() if name.startswith("<") else ""
+
+
+def challenge_filters(
+    filters: list[str], names: Iterable[str]
+) -> tuple[set[str], set[str], set[str]]:
+    # Sort the (casefolded) filters into the statuses, categories and members they name.
+    categories = {challenge_category(name) for name in names}
+    wanted: tuple[set[str], set[str], set[str]] = (set(), set(), set())
+    for f in filters:
+        statuses = {s for s in CHALLENGE_STATUSES if s.startswith(f)}
+        if statuses:
+            wanted[0].update(statuses)
+        elif f in categories:
+            wanted[1].add(f)
+        else:
+            wanted[2].add(f)
+    return wanted
+
+
+def challenge_matches(
+    name: str,
+    status: str,
+    statuses: set[str],
+    categories: set[str],
+    members: set[str],
+) -> bool:
+    # Whether a challenge matches any of the filters of each kind, a kind with no filters
+    # matches everything.
+    state, _, member = status.casefold().partition(" - ")
+    return (
+        (not statuses or state in statuses)
+        and (not categories or challenge_category(name) in categories)
+        and (not members or member in members)
+    )
 
 
-class CredentialsNotFound(Exception):
-    pass
+def challenge_pages(
+    challenges: Iterable[tuple[str, str]], limit: int = 1989
+) -> Iterator[str]:
+    # Pages of "[name]: status" lines, each at most `limit` characters, yielded as soon as
+    # they are full. Lines are only joined once per page, so this is linear in the list size.
+    page: list[str] = []
+    size = 0
+    for name, status in challenges:
+        line = f"[{name}]: {status}\n"
+        if page and size + len(line) > limit:
+            yield "".join(page)
+            page, size = [], 0
+        page.append(line)
+        size += len(line)
+    if page:
+        yield "".join(page)
 
 
-class NonceNotFound(Exception):
+class CredentialsNotFound(Exception):
     pass
 
 
-def getChallenges(url: str, username: str, password: str):
-    # Pull challenges from a ctf hosted with the commonly used CTFd platform using provided credentials
-    whitelist = set(
-        string.ascii_letters
-        + string.digits
-        + " "
-        + "-"
-        + "!"
-        + "#"
-        + "_"
-        + "["
-        + "]"
-        + "("
-        + ")"
-        + "?"
-        + "@"
-        + "+"
-        + "<"
-        + ">"
-    )
-    fingerprint = "Powered by CTFd"
-    s = requests.session()
-    if url[-1] == "/":
-        url = url[:-1]
-    r = s.get(f"{url}/login")
-    if fingerprint not in r.text:
-        raise InvalidProvider("CTF is not based on CTFd, cannot pull challenges.")
-    else:
-        # Get the nonce from the login page.
-        try:
-            nonce = r.text.split("csrfNonce': \"")[1].split('"')[0]
-        except:  # sometimes errors happen here, my theory is that it is different versions of CTFd
-            try:
-                nonce = r.text.split('name="nonce" value="')[1].split('">')[0]
-            except:
-                raise NonceNotFound(
-                    "Was not able to find the nonce token from login, please >report this along with the ctf url."
-                )
-        # Login with the username, password, and nonce
-        r = s.post(
-            f"{url}/login",
-            data={"name": username, "password": password, "nonce": nonce},
-        )
-        if "Your username or password is incorrect" in r.text:
-            raise InvalidCredentials("Invalid login credentials")
-        r_chals = s.get(f"{url}/api/v1/challenges")
-        all_challenges = r_chals.json()
-        r_solves = s.get(f"{url}/api/v1/teams/me/solves")
-        team_solves = r_solves.json()
-        if "success" not in team_solves:
-            # ctf is user based.  There is a flag on CTFd for this (userMode), but it is not present in all versions, this way seems to be.
-            r_solves = s.get(f"{url}/api/v1/users/me/solves")
-            team_solves = r_solves.json()
-
-        solves: list[str] = []
-        if team_solves["success"] == True:
-            for solve in team_solves["data"]:
-                cat = solve["challenge"]["category"]
-                challname = solve["challenge"]["name"]
-                solves.append(f"<{cat}> {challname}")
-        challenges: dict[str, str] = {}
-        if all_challenges["success"] == True:
-            for chal in all_challenges["data"]:
-                cat = chal["category"]
-                challname = chal["name"]
-                name = f"<{cat}> {challname}"
-                # print(name)
-                # print(strip_string(name, whitelist))
-                if name not in solves:
-                    challenges.update({strip_string(name, whitelist): "Unsolved"})
-                else:
-                    challenges.update({strip_string(name, whitelist): "Solved"})
-        else:
-            raise Exception("Error making request")
-        # Returns all the new challenges and their corresponding statuses in a dictionary compatible with the structure that would happen with 'normal' useage.
-        return challenges
-
-
 class CTF(commands.Cog):
     """
     Commands for managing CTFs.
     """
 
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: NullCTFBot):
         super().__init__()
         self.bot = bot
 
+    async def cog_load(self):
+        await database.teams.ensure_indexes()
+        active_ctf_channels.clear()
+        active_ctf_channels.update(await database.teams.channel_ids())
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        if channel.id in active_ctf_channels:
+            active_ctf_channels.discard(channel.id)
+            await database.teams.delete(channel.guild.id, channel.id)
+            invalidate_challenges(channel.guild.id, channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ):
+        if after.id in active_ctf_channels and before.name != after.name:
+            await database.teams.update(after.guild.id, after.id, {"name": after.name})
+
     @commands.group()
     async def ctf(self, ctx: Context):
         """
@@ -169,19 +380,10 @@ class CTF(commands.Cog):
         if ctx.guild is None:
             raise commands.NoPrivateMessage
         # Create a new channel in the CTF category (default='CTF' or configured with the configuration extension)
-        try:
-            sconf = serverdb[str(ctx.guild.id) + "-CONF"]
-            servcatres = sconf.find_one({"name": "category_name"})
-            servcat: str = servcatres["ctf_category"] if servcatres else "CTF"
-        except:
-            servcat = "CTF"
-
-        category = discord.utils.get(ctx.guild.categories, name=servcat)
-        if (
-            category == None
-        ):  # Checks if category exists, if it doesn't it will create it.
-            await ctx.guild.create_category(name=servcat)
-            category = discord.utils.get(ctx.guild.categories, name=servcat)
+        conf = await database.guild_configs.get(ctx.guild.id)
+        category = await get_category(
+            ctx.guild, conf.ctf_category, conf.ctf_category_id, "ctf_category_id"
+        )
 
         ctf_name = (
             strip_string(name, set(string.ascii_letters + string.digits + " " + "-"))
@@ -201,11 +403,16 @@ class CTF(commands.Cog):
                 prev = c
             ctf_name = new_ctf_name
 
-        await ctx.guild.create_text_channel(name=ctf_name, category=category)
-        server = teamdb[str(ctx.guild.id)]
-        await ctx.guild.create_role(name=ctf_name, mentionable=True)
-        ctf_info = {"name": ctf_name, "text_channel": ctf_name}
-        server.update_one({"name": ctf_name}, {"$set": ctf_info}, upsert=True)
+        channel = await ctx.guild.create_text_channel(name=ctf_name, category=category)
+        role = await ctx.guild.create_role(name=ctf_name, mentionable=True)
+        ctf_info = {
+            "name": ctf_name,
+            "text_channel": ctf_name,
+            "role_id": role.id,
+            "category_id": category.id,
+        }
+        await database.teams.update(ctx.guild.id, channel.id, ctf_info)
+        active_ctf_channels.add(channel.id)
         # Give a visual confirmation of completion.
         await ctx.message.add_reaction("✅")
 
@@ -225,14 +432,16 @@ class CTF(commands.Cog):
             raise commands.NoPrivateMessage
         # Delete role from server, delete entry from db
         try:
-            role = discord.utils.get(ctx.guild.roles, name=str(ctx.message.channel))
+            role = await ctf_role(ctx)
             if role == None:
                 raise commands.RoleNotFound(str(ctx.message.channel))
             await role.delete()
             await ctx.send(f"`{role.name}` role deleted")
         except:  # role most likely already deleted with archive
             pass
-        teamdb[str(ctx.guild.id)].delete_one({"name": str(ctx.message.channel)})
+        await database.teams.delete(ctx.guild.id, ctx.channel.id)
+        invalidate_challenges(ctx.guild.id, ctx.channel.id)
+        active_ctf_channels.discard(ctx.channel.id)
         await ctx.send(f"`{str(ctx.message.channel)}` deleted from db")
 
     @commands.bot_has_permissions(manage_channels=True, manage_roles=True)
@@ -246,28 +455,24 @@ class CTF(commands.Cog):
         if ctx.guild is None:
             raise commands.NoPrivateMessage
         # Delete the role, and move the ctf channel to either the default category (Archive) or whatever has been configured.
-        role = discord.utils.get(ctx.guild.roles, name=str(ctx.message.channel))
+        role = await ctf_role(ctx)
         if role == None:
             raise commands.RoleNotFound(str(ctx.message.channel))
         await role.delete()
         await ctx.send(f"`{role.name}` role deleted, archiving channel.")
-        try:
-            sconf = serverdb[str(ctx.guild.id) + "-CONF"]
-            servarchiveres = sconf.find_one({"name": "archive_category_name"})
-            servarchive = (
-                servarchiveres["archive_category"] if servarchiveres else "ARCHIVE"
-            )
-        except:
-            servarchive = "ARCHIVE"  # default
-
-        category = discord.utils.get(ctx.guild.categories, name=servarchive)
-        if (
-            category == None
-        ):  # Checks if category exists, if it doesn't it will create it.
-            await ctx.guild.create_category(name=servarchive)
-            category = discord.utils.get(ctx.guild.categories, name=servarchive)
+        conf = await database.guild_configs.get(ctx.guild.id)
+        category = await get_category(
+            ctx.guild,
+            conf.archive_category,
+            conf.archive_category_id,
+            "archive_category_id",
+        )
+        # Archived channels keep their challenge info, so they stay in active_ctf_channels.
         if isinstance(ctx.message.channel, discord.TextChannel):
             await ctx.message.channel.edit(sync_permissions=True, category=category)
+            await database.teams.update(
+                ctx.guild.id, ctx.channel.id, {"category_id": category.id}
+            )
 
     @ctf.command(hidden=True)
     @in_ctf_channel()
@@ -290,7 +495,7 @@ which will move the channel and delete the role, but retain challenge info(`>con
         if ctx.guild is None or not isinstance(user, discord.Member):
             raise commands.NoPrivateMessage
         # Give the user the role of whatever ctf channel they're currently in.
-        role = discord.utils.get(ctx.guild.roles, name=str(ctx.message.channel))
+        role = await ctf_role(ctx)
         if role == None:
             raise commands.RoleNotFound(str(ctx.message.channel))
         await user.add_roles(role)
@@ -307,7 +512,7 @@ which will move the channel and delete the role, but retain challenge info(`>con
         if ctx.guild is None or not isinstance(user, discord.Member):
             raise commands.NoPrivateMessage
         # Remove from the user the role of the ctf channel they're currently in.
-        role = discord.utils.get(ctx.guild.roles, name=str(ctx.message.channel))
+        role = await ctf_role(ctx)
         if role == None:
             raise commands.RoleNotFound(str(ctx.message.channel))
         await user.remove_roles(role)
@@ -322,73 +527,52 @@ which will move the channel and delete the role, but retain challenge info(`>con
         pass
 
     @staticmethod
-    def updateChallenge(ctx: Context, name: str, status: str):
+    async def updateChallenge(ctx: Context, names: Iterable[str], status: str):
         if ctx.guild is None:
             raise commands.NoPrivateMessage
-        # Update the db with a new challenge and its status
-        server = teamdb[str(ctx.guild.id)]
-        whitelist = set(
-            string.ascii_letters
-            + string.digits
-            + " "
-            + "-"
-            + "!"
-            + "#"
-            + "_"
-            + "["
-            + "]"
-            + "("
-            + ")"
-            + "?"
-            + "@"
-            + "+"
-            + "<"
-            + ">"
-        )
-        challenge = {strip_string(str(name), whitelist): status}
-        ctf = server.find_one({"name": str(ctx.message.channel)})
-        try:  # If there are existing challenges already...
-            if ctf is None:
-                raise KeyError
-            challenges: dict[str, str] = ctf["challenges"]
-            challenges.update(challenge)
-        except:
-            challenges = challenge
-        ctf_info = {"name": str(ctx.message.channel), "challenges": challenges}
-        server.update_one(
-            {"name": str(ctx.message.channel)}, {"$set": ctf_info}, upsert=True
+        # Update the db with new challenges and their status, all in one write
+        await database.teams.set_challenges(
+            ctx.guild.id, ctx.channel.id, {name: status for name in names}
         )
+        invalidate_challenges(ctx.guild.id, ctx.channel.id)
 
     @challenge.command(aliases=["a"])
     @in_ctf_channel()
-    async def add(self, ctx: Context, name: str):
+    async def add(self, ctx: Context, *names: str):
         """
-        Add a challenge to the challenge list for the ctf channel.
+        Add challenges to the challenge list for the ctf channel.
 
         Parameters
         ----------
-        name : str
-            The name of the challenge.
+        names : str
+            The names of the challenges, or a code block / attached text file with one per line.
         """
-        CTF.updateChallenge(ctx, name, "Unsolved")
+        challenges = await challenge_names(ctx, names)
+        await CTF.updateChallenge(ctx, challenges, "Unsolved")
         await ctx.send(
-            f"`{name}` has been added to the challenge list for `{str(ctx.message.channel)}`"
+            f"{name_list(challenges)} {'has' if len(challenges) == 1 else 'have'} been added to the challenge list for `{str(ctx.message.channel)}`"
         )
 
     @challenge.command(aliases=["s", "solve"])
     @in_ctf_channel()
-    async def solved(self, ctx: Context, name: str):
+    async def solved(self, ctx: Context, *names: str):
         """
-        Mark a challenge as solved.
+        Mark challenges as solved.
 
         Parameters
         ----------
-        name : str
-            The name of the challenge."""
+        names : str
+            The names of the challenges, or a code block / attached text file with one per line.
+        """
+        challenges, _ = await resolve_challenges(
+            ctx, await challenge_names(ctx, names), keep_unknown=True
+        )
+        if not challenges:
+            return
         solve = f"Solved - {str(ctx.message.author)}"
-        CTF.updateChallenge(ctx, name, solve)
+        await CTF.updateChallenge(ctx, challenges, solve)
         await ctx.send(
-            f":triangular_flag_on_post: `{name}` has been solved by `{str(ctx.message.author)}`"
+            f":triangular_flag_on_post: {name_list(challenges)} {'has' if len(challenges) == 1 else 'have'} been solved by `{str(ctx.message.author)}`"
         )
 
     @challenge.command(aliases=["w"])
@@ -402,102 +586,97 @@ which will move the channel and delete the role, but retain challenge info(`>con
         name : str
             The name of the challenge.
         """
+        name = strip_string(str(name), CHALLENGE_WHITELIST)
+        if not name:
+            raise commands.BadArgument("Invalid challenge name")
+        challenges, _ = await resolve_challenges(ctx, [name], keep_unknown=True)
+        if not challenges:
+            return
         work = f"Working - {str(ctx.message.author)}"
-        CTF.updateChallenge(ctx, name, work)
-        await ctx.send(f"`{str(ctx.message.author)}` is working on `{name}`!")
+        await CTF.updateChallenge(ctx, challenges, work)
+        await ctx.send(f"`{str(ctx.message.author)}` is working on `{challenges[0]}`!")
 
     @challenge.command(aliases=["r", "delete", "d"])
     @in_ctf_channel()
-    async def remove(self, ctx: Context, name: str):
+    async def remove(self, ctx: Context, *names: str):
         """
-        Remove a challenge from the challenge list.
+        Remove challenges from the challenge list.
 
         Parameters
         ----------
-        name : str
-            The name of the challenge.
+        names : str
+            The names of the challenges, or a code block / attached text file with one per line.
         """
         if ctx.guild is None:
             raise commands.NoPrivateMessage
         # Typos can happen (remove a ctf challenge from the list)
-        ctf = teamdb[str(ctx.guild.id)].find_one({"name": str(ctx.message.channel)})
-        if ctf is None:
-            return
-        challenges = ctf["challenges"]
-        whitelist = set(
-            string.ascii_letters
-            + string.digits
-            + " "
-            + "-"
-            + "!"
-            + "#"
-            + "_"
-            + "["
-            + "]"
-            + "("
-            + ")"
-            + "?"
-            + "@"
-            + "+"
-            + "<"
-            + ">"
-        )
-        name = strip_string(name, whitelist)
-        challenges.pop(name, None)
-        ctf_info = {"name": str(ctx.message.channel), "challenges": challenges}
-        teamdb[str(ctx.guild.id)].update_one(
-            {"name": str(ctx.message.channel)}, {"$set": ctf_info}, upsert=True
+        challenges, unknown = await resolve_challenges(
+            ctx, await challenge_names(ctx, names), keep_unknown=False
         )
-        await ctx.send(f"Removed `{name}`")
+        if challenges:
+            await database.teams.remove_challenges(
+                ctx.guild.id, ctx.channel.id, challenges
+            )
+            invalidate_challenges(ctx.guild.id, ctx.channel.id)
+            await ctx.send(f"Removed {name_list(challenges)}")
+        if unknown:
+            await ctx.send(f"No challenge matches {name_list(unknown)}")
 
-    @challenge.command(aliases=["get", "ctfd"])
+    @challenge.command(aliases=["get", "ctfd", "rctf"])
     @in_ctf_channel()
     async def pull(self, ctx: Context, url: str):
         """
-        Will add all of the challenges on the provided CTFd CTF.
+        Will add all of the challenges on the provided CTF.
 
         This command will include solve state.
+        The platform is detected from the URL, CTFd and rCTF are supported.
 
-        If the website requires login, you must set the credentials first.
+        If the website requires login, you must set the credentials (an access token
+        or a username and password, the team token for rCTF) first.
         See `setcreds`.
 
         Parameters
         ----------
         url : str
-            The URL of the CTFd CTF.
+            The URL of the CTF.
         """
         if ctx.guild is None:
             raise commands.NoPrivateMessage
-        # Pull challenges from a ctf hosted on the CTFd platform
+        # Pull challenges from a ctf hosted on one of the supported platforms
         try:
             try:
                 # Get the credentials from the pinned message
                 pinned = await ctx.message.channel.pins()
-                user_pass = CTF.get_creds(pinned)
+                creds = CTF.get_creds(pinned)
             except CredentialsNotFound as cnfm:
                 return await ctx.send(str(cnfm))
-            ctfd_challs = getChallenges(url, user_pass[0], user_pass[1])
-            ctf = teamdb[str(ctx.guild.id)].find_one({"name": str(ctx.message.channel)})
-            try:  # If there are existing challenges already...
-                if ctf is None:
-                    raise KeyError
-                challenges: dict[str, str] = ctf["challenges"]
-                challenges.update(ctfd_challs)
-            except:
-                challenges = ctfd_challs
-            ctf_info = {"name": str(ctx.message.channel), "challenges": challenges}
-            teamdb[str(ctx.guild.id)].update_one(
-                {"name": str(ctx.message.channel)}, {"$set": ctf_info}, upsert=True
+            result = await providers.pull(
+                self.bot.web,
+                url,
+                creds,
+                session_key=(ctx.guild.id, ctx.channel.id),
             )
+            pulled: dict[str, str] = {}
+            for name, status in result.challenges.items():
+                name = strip_string(name, CHALLENGE_WHITELIST)
+                if name:
+                    pulled[name] = status
+            await database.teams.set_challenges(ctx.guild.id, ctx.channel.id, pulled)
+            invalidate_challenges(ctx.guild.id, ctx.channel.id)
             await ctx.message.add_reaction("✅")
+            await ctx.send(
+                f"Pulled `{len(pulled)}` challenges ({result.timing_summary()})"
+            )
         except InvalidProvider as ipm:
             await ctx.send(str(ipm))
         except InvalidCredentials as icm:
             await ctx.send(str(icm))
         except NonceNotFound as nnfm:
             await ctx.send(str(nnfm))
-        except requests.exceptions.MissingSchema:
-            await ctx.send("Supply a valid url in the form: `http(s)://ctfd.url`")
+        except PullFailed as pfm:
+            await ctx.send(str(pfm))
+        except aiohttp.InvalidURL:
+            await ctx.send("Supply a valid url in the form: `http(s)://ctf.url`")
         except:
             traceback.print_exc()
 
@@ -505,7 +684,13 @@ which will move the channel and delete the role, but retain challenge info(`>con
     @commands.has_permissions(manage_messages=True)
     @ctf.command(aliases=["login"])
     @in_ctf_channel()
-    async def setcreds(self, ctx: Context, username: str, password: str):
+    async def setcreds(
+        self,
+        ctx: Context,
+        username: str,
+        password: str | None = None,
+        token: str | None = None,
+    ):
         """
         Pin the message of ctf credentials.
 
@@ -515,17 +700,27 @@ which will move the channel and delete the role, but retain challenge info(`>con
         Parameters
         ----------
         username : str
-            The username for the CTFd platform.
+            The username for the CTF platform, or an access token (rCTF team token) on its own.
+        password : str
+            The password for the CTF platform.
+        token : str
+            An access token, used before the username and password.
         """
+        if password is None:
+            # Only an access token, e.g. >ctf setcreds ctfd_0123abcd
+            token = username
         # Creates a pinned message with the credntials supplied by the user
         pinned = await ctx.message.channel.pins()
         for pin in pinned:
             if "CTF credentials set." in pin.content:
                 # Look for previously pinned credntials, and remove them if they exist.
                 await pin.unpin()
-        msg = await ctx.send(
-            f"CTF credentials set. name:{username} password:{password}"
-        )
+        content = "CTF credentials set."
+        if password is not None:
+            content += f" name:{username} password:{password}"
+        if token:
+            content += f" token:{token}"
+        msg = await ctx.send(content)
         await msg.pin()
 
     @commands.bot_has_permissions(manage_messages=True)
@@ -540,70 +735,77 @@ which will move the channel and delete the role, but retain challenge info(`>con
         # Send a message with the credntials
         pinned = await ctx.message.channel.pins()
         try:
-            user_pass = CTF.get_creds(pinned)
-            await ctx.send(f"name:`{user_pass[0]}` password:`{user_pass[1]}`")
+            creds = CTF.get_creds(pinned)
+            shown: list[str] = []
+            if creds.username is not None:
+                shown.append(f"name:`{creds.username}` password:`{creds.password}`")
+            if creds.token:
+                shown.append(f"token:`{creds.token}`")
+            await ctx.send(" ".join(shown))
         except CredentialsNotFound as cnfm:
             await ctx.send(str(cnfm))
 
     @staticmethod
-    def get_creds(pinned: list[discord.Message]):
+    def get_creds(pinned: list[discord.Message]) -> Credentials:
+        # "CTF credentials set. [name:<username> password:<password>] [token:<token>]"
         for pin in pinned:
             if "CTF credentials set." in pin.content:
-                user_pass = pin.content.split("name:")[1].split(" password:")
-                return user_pass
+                rest = pin.content.split("CTF credentials set.", 1)[1]
+                creds = Credentials()
+                if " token:" in rest:
+                    rest, _, creds.token = rest.rpartition(" token:")
+                if "name:" in rest:
+                    user_pass = rest.split("name:", 1)[1].split(" password:", 1)
+                    creds.username, creds.password = user_pass[0], user_pass[-1]
+                return creds
         raise CredentialsNotFound(
-            'Set credentials with `>ctf setcreds "username" "password"`'
+            'Set credentials with `>ctf setcreds "username" "password"` or `>ctf setcreds "access token"`'
         )
 
-    @staticmethod
-    def gen_page(challengelist: list[str]):
-        # Function for generating each page (message) for the list of challenges in a ctf.
-        challenge_page = ""
-        challenge_pages: list[str] = []
-        for c in challengelist:
-            # Discord message sizes cannot exceed 2000 characters.
-            # This will create a new message every 2k characters.
-            if not len(challenge_page + c) >= 1989:
-                challenge_page += c
-                if c == challengelist[-1]:  # if it is the last item
-                    challenge_pages.append(challenge_page)
-
-            elif len(challenge_page + c) >= 1989:
-                challenge_pages.append(challenge_page)
-                challenge_page = ""
-                challenge_page += c
-
-        # print(challenge_pages)
-        return challenge_pages
-
     @challenge.command(aliases=["ls", "l"])
     @in_ctf_channel()
-    async def list(self, ctx: Context):
+    async def list(self, ctx: Context, *filters: str):
         """
         Get a list of the challenges in the ctf, and their statuses.
+
+        Parameters
+        ----------
+        filters : str
+            Only list challenges with these statuses (solved, unsolved, working, or their start), categories or assignees ("me" for yourself), any of each kind
         """
         if ctx.guild is None:
             raise commands.NoPrivateMessage
         # list the challenges in the current ctf.
-        ctf_challenge_list = []
-        server = teamdb[str(ctx.guild.id)]
-        ctf = server.find_one({"name": str(ctx.message.channel)})
-        try:
-            if ctf is None:
-                raise KeyError
-            ctf_challenge_list: list[str] = []
-            for k, v in ctf["challenges"].items():
-                challenge = f"[{k}]: {v}\n"
-                ctf_challenge_list.append(challenge)
-
-            for page in CTF.gen_page(ctf_challenge_list):
-                await ctx.send(f"```ini\n{page}```")
-                # ```ini``` makes things in '[]' blue which looks nice :)
-        except KeyError as _:  # If nothing has been added to the challenges list
+        ctf = await fetch_ctf(ctx)
+        challenges = ctf.get("challenges") if ctf else None
+        if ctf is None or not challenges:
+            # If nothing has been added to the challenges list
             await ctx.send("Error: No challeges added.")
-        except:
-            traceback.print_exc()
+            return
+
+        wanted = challenge_filters(
+            [
+                str(ctx.author).casefold() if f.casefold() == "me" else f.casefold()
+                for f in filters
+            ],
+            challenges,
+        )
+        matching = (
+            (name, status)
+            for name, status in challenges.items()
+            if challenge_matches(name, status, *wanted)
+        )
+        pages = (
+            EmbedData(
+                title=f"{ctf['name']} challenges",
+                # ```ini``` makes things in '[]' blue which looks nice :)
+                description=f"```ini\n{page}```",
+            )
+            for page in challenge_pages(matching)
+        )
+        if not await PaginationView(pages, ctx, ctx.channel).send():
+            await ctx.send(f"No challenges match `{' '.join(filters)}`.")
 
 
-async def setup(bot: commands.Bot):
+async def setup(bot: NullCTFBot):
     await bot.add_cog(CTF(bot))
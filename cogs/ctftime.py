@@ -1,28 +1,70 @@
-from datetime import UTC, datetime, timezone
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from hashlib import sha1
+from time import monotonic
+from typing import Any
 
 import discord
-import requests
 from colorama import Fore, Style
 from dateutil.parser import isoparse  # pip install python-dateutil
 from discord.ext import commands, tasks
 
-from common import Context, EventT
-from config_vars import ctfs
+import config_vars
+import database
+from common import (
+    Context,
+    EmbedData,
+    EventT,
+    LeaderboardT,
+    NullCTFBot,
+    send_embeds,
+    time_window,
+)
 
 # All commands for getting data from ctftime.org (a popular platform for finding CTF events)
 
+# Shown for events without a logo of their own.
+CTFTIME_LOGO = (
+    "https://pbs.twimg.com/profile_images/2189766987/ctftime-logo-avatar_400x400.png"
+)
+
+
+@dataclass
+class RenderedEvent:
+    # The embeds of an event, for the version of it with this content hash.
+    hash: str
+    finish_ts: int
+    upcoming: EmbedData
+    current: EmbedData
+
 
 class CTFTime(commands.Cog):
     """
     CTFtime commands to show status of CTFs.
     """
 
-    limit = 5
+    # Events are fetched from ctftime.org this many at a time.
+    page_size = 100
+    # The most events `upcoming` will show at once.
+    max_upcoming = 25
 
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: NullCTFBot):
         super().__init__()
         self.bot = bot
-        self.upcoming_l = []
+        self.refresh_lock = asyncio.Lock()
+        self.refreshed_at = float(
+            "-inf"
+        )  # monotonic time of the last successful refresh
+        self.refresh_task: asyncio.Task[list[EventT]] | None = None
+        self.leaderboards: dict[int, LeaderboardT] = {}
+        # Event id -> its pre-rendered embeds, rendered at ingest and on first display.
+        self.rendered: dict[int, RenderedEvent] = {}
+
+    async def cog_load(self):
+        await database.events.ensure_indexes()
+        await database.leaderboards.ensure_indexes()
         self.updateDB.start()
 
     async def cog_command_error(self, ctx: Context, error: Exception):
@@ -30,53 +72,114 @@ class CTFTime(commands.Cog):
 
     async def cog_unload(self):
         self.updateDB.cancel()
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+
+    @staticmethod
+    def parse_event(event: dict[str, Any]) -> EventT:
+        # Keep the fields we display, with start and finish as real datetimes so they can be
+        # range queried and expired by MongoDB.
+        start = isoparse(event["start"])
+        finish = isoparse(event["finish"])
+        return {
+            "id": event["id"],
+            "title": event["title"],
+            "start": start,
+            "finish": finish,
+            "start_ts": int(start.timestamp()),
+            "finish_ts": int(finish.timestamp()),
+            "duration": event["duration"],
+            "url": event["url"],
+            "logo": event["logo"],
+            "format": event["format"],
+            "onsite": event["onsite"],
+            "weight": event["weight"],
+        }
 
     @tasks.loop(minutes=30.0, reconnect=True)
     async def updateDB(self):
-        # Every 30 minutes, this will grab the 5 closest upcoming CTFs from ctftime.org and update my db with it.
+        # Every 30 minutes, this will grab the upcoming CTFs of the next CTFTIME_HORIZON_DAYS from ctftime.org and update my db with it.
         # I do this because there is no way to get current ctfs from the api, but by logging all upcoming ctfs [cont.]
         # I can tell by looking at the start and end date if it's currently running or not using unix timestamps.
+        await self.refresh()
+
+    def is_stale(self) -> bool:
+        return monotonic() - self.refreshed_at > config_vars.CTFTIME_FRESHNESS
+
+    def revalidate(self):
+        # Refresh the cache in the background, without making the caller wait for ctftime.org.
+        if self.refresh_lock.locked() or (
+            self.refresh_task is not None and not self.refresh_task.done()
+        ):
+            return
+        self.refresh_task = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> list[EventT]:
+        async with self.refresh_lock:
+            return await self._refresh()
+
+    async def fetch_window(self, start: int, finish: int) -> list[dict[str, Any]]:
+        # The API has no offset, so pages are walked by moving the window's start up to the
+        # start of the last event of each full page (events come sorted by start).
+        upcoming = "https://ctftime.org/api/v1/events/"
+        seen: dict[int, dict[str, Any]] = {}
+        while start < finish:
+            response = await self.bot.web.get(
+                upcoming,
+                params={"limit": self.page_size, "start": start, "finish": finish},
+            )
+            page: list[dict[str, Any]] = response.json()
+            for event in page:
+                seen[event["id"]] = event
+            if len(page) < self.page_size:
+                break
+            last_start = int(isoparse(page[-1]["start"]).timestamp())
+            # A full page of events sharing one start time would never advance the window.
+            start = last_start if last_start > start else start + 1
+        return list(seen.values())
+
+    @staticmethod
+    def event_hash(event: EventT) -> str:
+        content = {k: v for k, v in event.items() if k != "hash"}
+        return sha1(
+            json.dumps(content, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    async def _refresh(self) -> list[EventT]:
         now = datetime.now(UTC)
-        unix_now = int(now.replace(tzinfo=timezone.utc).timestamp())
-        headers = {
-            "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:61.0) Gecko/20100101 Firefox/61.0",
+        unix_now = int(now.timestamp())
+        horizon = unix_now + config_vars.CTFTIME_HORIZON_DAYS * 24 * 3600
+        jdata = await self.fetch_window(unix_now, horizon)
+
+        info = [self.parse_event(event) for event in jdata]
+        hashes = {ctf["id"]: self.event_hash(ctf) for ctf in info}
+        for ctf in info:
+            ctf["hash"] = hashes[ctf["id"]]
+        # Only events that are new or whose content changed are written, all in one write.
+        known = await database.events.hashes(list(hashes))
+        # Render ahead of time, events whose hash didn't change keep their embeds.
+        for ctf in info:
+            self.render(ctf)
+        self.rendered = {
+            k: v for k, v in self.rendered.items() if v.finish_ts > unix_now
         }
-        upcoming = "https://ctftime.org/api/v1/events/"
-        response = requests.get(upcoming, headers=headers, params={"limit": self.limit})
-        jdata: list[EventT] = response.json()
-
-        info: list[EventT] = []
-        for num, _ in enumerate(jdata):  # Generate list of dicts of upcoming ctfs
-            ctf: EventT = {
-                "title": jdata[num]["title"],
-                "start": jdata[num]["start"],
-                "finish": jdata[num]["finish"],
-                "duration": jdata[num]["duration"],
-                "url": jdata[num]["url"],
-                "logo": jdata[num]["logo"],
-                "format": jdata[num]["format"],
-                "onsite": jdata[num]["onsite"],
-            }
-            info.append(ctf)
-
-        got_ctfs: list[str] = []
-        for (
-            ctf
-        ) in info:  # If the document doesn't exist: add it, if it does: update it.
-            ctfs.update_one({"title": ctf["title"]}, {"$set": ctf}, upsert=True)
-            got_ctfs.append(ctf["title"])
+        changed = [ctf for ctf in info if known.get(ctf["id"]) != hashes[ctf["id"]]]
+        await database.events.upsert_many(changed)
         print(
             Fore.WHITE
             + f"{datetime.now()}: "
             + Fore.GREEN
-            + f"Got and updated {got_ctfs}"
+            + f"Got {len(info)} ctfs, updated {[ctf['title'] for ctf in changed]}"
         )
         print(Style.RESET_ALL)
 
         # Delete ctfs that are over from the db
-        for ctf in ctfs.find():
-            if isoparse(ctf["finish"]).timestamp() < unix_now:
-                ctfs.delete_one({"title": ctf["title"]})
+        await database.events.delete_finished(now)
+        self.refreshed_at = monotonic()
+        if changed:
+            # Lets other cogs (e.g. reminders) follow events whose times moved.
+            self.bot.dispatch("ctftime_events_changed", changed)
+        return changed
 
     @updateDB.before_loop
     async def before_updateDB(self):
@@ -104,46 +207,85 @@ class CTFTime(commands.Cog):
         """
         return info on the currently running ctfs on ctftime.org
         """
-        now = datetime.now(UTC)
-        unix_now = int(now.replace(tzinfo=timezone.utc).timestamp())
-        running = False
-
-        for ctf in ctfs.find():
-            # Check if the ctf is running
-            if (
-                isoparse(ctf["start"]).timestamp() < unix_now
-                and isoparse(ctf["finish"]).timestamp() > unix_now
-            ):
-                running = True
-                embed = discord.Embed(
-                    title=":red_circle: " + ctf["title"] + " IS LIVE",
-                    description=ctf["url"],
-                    color=15874645,
-                )
-                start = f"<t:{int(isoparse(ctf['start']).timestamp())}:F>"
-                end = f"<t:{int(isoparse(ctf['finish']).timestamp())}:F>"
-                if ctf["logo"] != "":
-                    embed.set_thumbnail(url=ctf["logo"])
-                else:
-                    embed.set_thumbnail(
-                        url="https://pbs.twimg.com/profile_images/2189766987/ctftime-logo-avatar_400x400.png"
-                    )
-                    # CTFtime logo
-                dur = (
-                    f"{ctf['duration']['days']} days, {ctf['duration']['hours']} hours"
-                )
-                embed.add_field(name="Duration", value=dur, inline=True)
-                embed.add_field(name="Format", value=ctf["format"], inline=True)
-                embed.add_field(
-                    name="Timeframe", value=start + " -> " + end, inline=True
-                )
-                await ctx.channel.send(embed=embed)
+        unix_now = int(datetime.now(UTC).timestamp())
+        running = await database.events.running(unix_now)
+        # All of them in as few messages as possible.
+        await send_embeds(ctx.channel, [self.render(ctf).current for ctf in running])
 
-        if running == False:  # No ctfs were found to be running
+        if not running:  # No ctfs were found to be running
             await ctx.send(
                 "No CTFs currently running! Check out >ctftime countdown, and >ctftime upcoming to see when ctfs will start!"
             )
 
+    def render(self, ctf: EventT) -> RenderedEvent:
+        rendered = self.rendered.get(ctf["id"])
+        content_hash = ctf.get("hash") or self.event_hash(ctf)
+        if rendered is None or rendered.hash != content_hash:
+            rendered = RenderedEvent(
+                hash=content_hash,
+                finish_ts=ctf["finish_ts"],
+                upcoming=self.upcoming_embed(ctf),
+                current=self.current_embed(ctf),
+            )
+            self.rendered[ctf["id"]] = rendered
+        return rendered
+
+    @staticmethod
+    def current_embed(ctf: EventT) -> EmbedData:
+        start = f"<t:{ctf['start_ts']}:F>"
+        end = f"<t:{ctf['finish_ts']}:F>"
+        dur = f"{ctf['duration']['days']} days, {ctf['duration']['hours']} hours"
+        return EmbedData(
+            title=":red_circle: " + ctf["title"] + " IS LIVE",
+            description=ctf["url"],
+            color=discord.Color(15874645),
+            thumbnail=ctf["logo"] or CTFTIME_LOGO,
+            fields=[
+                {"name": "Duration", "value_raw": [dur]},
+                {"name": "Format", "value_raw": [ctf["format"]]},
+                {"name": "Timeframe", "value_raw": [start + " -> " + end]},
+            ],
+        )
+
+    async def upcoming_events(self, amount: int) -> list[EventT]:
+        # Served from the local cache, which is only refreshed (in the background) once it is stale.
+        unix_now = int(datetime.now(UTC).timestamp())
+        upcoming_data = await database.events.upcoming(unix_now, amount)
+        if not upcoming_data:
+            # Nothing cached yet, this is the only time a caller waits for ctftime.org.
+            await self.refresh()
+            upcoming_data = await database.events.upcoming(unix_now, amount)
+        elif self.is_stale():
+            self.revalidate()
+        return upcoming_data
+
+    @staticmethod
+    def upcoming_embed(ctf: EventT) -> EmbedData:
+        start = f"<t:{ctf['start_ts']}:F>"
+        end = f"<t:{ctf['finish_ts']}:F>"
+        dur_dict = ctf["duration"]
+        ctf_hours, ctf_days = (str(dur_dict["hours"]), str(dur_dict["days"]))
+        if ctf["onsite"] == False:
+            ctf_place = "Online"
+        else:
+            ctf_place = "Onsite"
+
+        return EmbedData(
+            title=ctf["title"],
+            description=ctf["url"],
+            color=discord.Color(int("f23a55", 16)),
+            thumbnail=ctf["logo"] or CTFTIME_LOGO,
+            fields=[
+                {
+                    "name": "Duration",
+                    "value_raw": [((ctf_days + " days, ") + ctf_hours) + " hours"],
+                },
+                {"name": "Format", "value_raw": [(ctf_place + " ") + ctf["format"]]},
+                {"name": "Weight", "value_raw": [str(ctf["weight"])]},
+                {"name": "Timeframe", "value_raw": [(start + " -> ") + end]},
+            ],
+        )
+
     @ctftime.command(aliases=["next"])
     async def upcoming(self, ctx: Context, amount: int | None = None):
         """
@@ -157,195 +299,153 @@ class CTFTime(commands.Cog):
         if not amount:
             amount = 3
         else:
-            amount = int(amount)
-        headers = {
-            "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:61.0) Gecko/20100101 Firefox/61.0",
+            amount = min(int(amount), self.max_upcoming)
+        upcoming = await self.upcoming_events(amount)
+        await send_embeds(ctx.channel, [self.render(ctf).upcoming for ctf in upcoming])
+
+    async def leaderboard(self, year: int) -> LeaderboardT | None:
+        # Finished years never change again and are kept forever, the current year is
+        # refetched once it is older than CTFTIME_LEADERBOARD_TTL.
+        now = datetime.now(UTC)
+        cached = self.leaderboards.get(year) or await database.leaderboards.get(year)
+        if cached is not None and (
+            cached["final"]
+            or (now - cached["fetched_at"]).total_seconds()
+            < config_vars.CTFTIME_LEADERBOARD_TTL
+        ):
+            self.leaderboards[year] = cached
+            return cached
+
+        r = await self.bot.web.get(
+            f"https://ctftime.org/api/v1/top/{year}/", params={"limit": 100}
+        )
+        if r.status != 200:
+            raise ValueError(f"Leaderboard request failed with status {r.status}")
+        top_data: list[dict[str, Any]] | None = r.json().get(str(year))
+        if top_data is None:
+            return None
+
+        # Pre-render every line, padding the ranks so the names line up.
+        width = len(f"[{len(top_data)}]") + 3
+        lines = [
+            f"{f'[{rank}]':<{width}}{team['team_name']}: {round(team['points'], 4)}"
+            for rank, team in enumerate(top_data, start=1)
+        ]
+        entry: LeaderboardT = {
+            "year": year,
+            "teams": top_data,
+            "lines": lines,
+            "fetched_at": now,
+            "final": year < now.year,
         }
-        upcoming_ep = "https://ctftime.org/api/v1/events/"
-        default_image = "https://pbs.twimg.com/profile_images/2189766987/ctftime-logo-avatar_400x400.png"
-        r = requests.get(upcoming_ep, headers=headers, params={"limit": amount})
-        # print("made request")
-
-        upcoming_data: list[EventT] = r.json()
-        # print("HERE")
-
-        for ctf in range(0, int(amount)):
-            ctf_title = upcoming_data[ctf]["title"]
-            weight = upcoming_data[ctf]["weight"]
-            start = f"<t:{int(isoparse(upcoming_data[ctf]['start']).timestamp())}:F>"
-            end = f"<t:{int(isoparse(upcoming_data[ctf]['finish']).timestamp())}:F>"
-            dur_dict = upcoming_data[ctf]["duration"]
-            (ctf_hours, ctf_days) = (str(dur_dict["hours"]), str(dur_dict["days"]))
-            ctf_link = upcoming_data[ctf]["url"]
-            ctf_image = upcoming_data[ctf]["logo"]
-            ctf_format = upcoming_data[ctf]["format"]
-            ctf_place = upcoming_data[ctf]["onsite"]
-            if ctf_place == False:
-                ctf_place = "Online"
-            else:
-                ctf_place = "Onsite"
-
-            embed = discord.Embed(
-                title=ctf_title, description=ctf_link, color=int("f23a55", 16)
-            )
-            if ctf_image != "":
-                embed.set_thumbnail(url=ctf_image)
-            else:
-                embed.set_thumbnail(url=default_image)
-
-            embed.add_field(
-                name="Duration",
-                value=((ctf_days + " days, ") + ctf_hours) + " hours",
-                inline=True,
-            )
-            embed.add_field(
-                name="Format", value=(ctf_place + " ") + ctf_format, inline=True
-            )
-            embed.add_field(
-                name="Weight", value=(str(weight)), inline=True
-            )
-            embed.add_field(name="Timeframe", value=(start + " -> ") + end, inline=True)
-            await ctx.channel.send(embed=embed)
+        await database.leaderboards.set(entry)
+        self.leaderboards[year] = entry
+        return entry
 
     @ctftime.command(aliases=["leaderboard"])
-    async def top(self, ctx: Context, year: str | None = None):
+    async def top(self, ctx: Context, year: int | None = None, amount: int = 10):
         """
         display the leaderboards from ctftime from a certain year.
 
         Parameters
         ----------
-        year : str
+        year : int
             The year to get the leaderboards for
+        amount : int
+            The number of teams to show, defaults to 10
         """
         if not year:
             # Default to current year
-            year = str(datetime.today().year)
-        headers = {
-            "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:61.0) Gecko/20100101 Firefox/61.0",
-        }
-        top_ep = f"https://ctftime.org/api/v1/top/{year}/"
-        leaderboards = ""
-        r = requests.get(top_ep, headers=headers)
-        if r.status_code != 200:
+            year = datetime.today().year
+        try:
+            entry = await self.leaderboard(year)
+        except ValueError:
             await ctx.send(
                 'Error retrieving data, please report this with `>report "what happened"`'
             )
-        else:
-            try:
-                top_data = (r.json())[year]
-                for team in range(10):
-                    # Leaderboard is always top 10 so we can just assume this for ease of formatting
-                    rank = team + 1
-                    teamname = top_data[team]["team_name"]
-                    score = str(round(top_data[team]["points"], 4))
-
-                    if team != 9:
-                        # This is literally just for formatting.  I'm sure there's a better way to do it but I couldn't think of one :(
-                        # If you know of a better way to do this, do a pull request or msg me and I'll add  your name to the cool list
-                        leaderboards += f"\n[{rank}]    {teamname}: {score}"
-                    else:
-                        leaderboards += f"\n[{rank}]   {teamname}: {score}\n"
+            return
+        if entry is None:
+            await ctx.send("Please supply a valid year.")
+            return
 
-                await ctx.send(
-                    f":triangular_flag_on_post:  **{year} CTFtime Leaderboards**```ini\n{leaderboards}```"
-                )
-            except KeyError as _:
-                await ctx.send("Please supply a valid year.")
-                # LOG THIS
+        header = f":triangular_flag_on_post:  **{year} CTFtime Leaderboards**```ini\n"
+        leaderboards = ""
+        for line in entry["lines"][: max(amount, 1)]:
+            # Discord message sizes cannot exceed 2000 characters.
+            if len(header) + len(leaderboards) + len(line) + 5 > 2000:
+                break
+            leaderboards += f"\n{line}"
+        await ctx.send(f"{header}{leaderboards}\n```")
 
     @ctftime.command()
     async def timeleft(self, ctx: Context):
         """
         return relative time until a currently running ctf ends.
         """
-        now = datetime.now(UTC)
-        unix_now = int(now.replace(tzinfo=timezone.utc).timestamp())
-        running = False
-        for ctf in ctfs.find():
-            # Check if the ctf is running
-            if (
-                isoparse(ctf["start"]).timestamp() < unix_now
-                and isoparse(ctf["finish"]).timestamp() > unix_now
-            ):
-                running = True
-                time = isoparse(ctf["finish"]).timestamp() - unix_now
-                days = time // (24 * 3600)
-                time = time % (24 * 3600)
-                hours = time // 3600
-                time %= 3600
-                minutes = time // 60
-                time %= 60
-                seconds = time
-                await ctx.send(
-                    f"```ini\n{ctf['title']} ends in: [{days} days], [{hours} hours], [{minutes} minutes], [{seconds} seconds]```\n{ctf['url']}"
-                )
+        unix_now = int(datetime.now(UTC).timestamp())
+        running = await database.events.running(unix_now)
+        for ctf in running:
+            await ctx.send(
+                f"```ini\n{ctf['title']} ends in: {time_window(ctf['finish_ts'] - unix_now)}```\n{ctf['url']}"
+            )
 
-        if running == False:
+        if not running:
             await ctx.send(
                 "No ctfs are running! Use >ctftime upcoming or >ctftime countdown to see upcoming ctfs"
             )
 
+    @staticmethod
+    def select_event(selection: str, events: list[EventT]) -> EventT | None:
+        # Pick an event by its position in `events`, its CTFtime event id, or a title prefix.
+        # `events` must come from a deterministic (sorted) query, so positions mean the same
+        # thing to every caller.
+        if selection.isdigit():
+            number = int(selection)
+            if 1 <= number <= len(events):
+                return events[number - 1]
+            return next((e for e in events if e["id"] == number), None)
+        prefix = selection.casefold()
+        return next(
+            (e for e in events if e["title"].casefold().startswith(prefix)), None
+        )
+
     @ctftime.command()
-    async def countdown(self, ctx: Context, params: int | None = None):
+    async def countdown(self, ctx: Context, *, selection: str | None = None):
         """
         return specific times for the time until a ctf begins.
 
         Parameters
         ----------
-        params : int
-            The number of the ctf to get the countdown for
+        selection : str
+            The number of the ctf in the list, its CTFtime event id, or the start of its title
         """
-        now = datetime.now(UTC)
-        unix_now = int(now.replace(tzinfo=timezone.utc).timestamp())
+        unix_now = int(datetime.now(UTC).timestamp())
+        upcoming = await database.events.upcoming(unix_now)
 
-        if params == None:
-            self.upcoming_l: list[EventT] = []
+        if selection == None:
             index = ""
-            for ctf in ctfs.find():
-                if isoparse(ctf["start"]).timestamp() > unix_now:
-                    # if the ctf start time is in the future...
-                    self.upcoming_l.append(ctf)
-            for i, c in enumerate(self.upcoming_l):
-                index += f"\n[{i + 1}] {c['title']}\n"
+            for i, c in enumerate(upcoming):
+                line = f"\n[{i + 1}] {c['title']} (id {c['id']})\n"
+                # Discord message sizes cannot exceed 2000 characters.
+                if len(index) + len(line) > 1900:
+                    break
+                index += line
 
             await ctx.send(
-                f"Type >ctftime countdown <number> to select.\n```ini\n{index}```"
+                f"Type >ctftime countdown <number/event id/title> to select.\n```ini\n{index}```"
             )
         else:
-            if self.upcoming_l != []:
-                x = int(params) - 1
-
-                time = isoparse(self.upcoming_l[x]["start"]).timestamp() - unix_now
-                days = time // (24 * 3600)
-                time = time % (24 * 3600)
-                hours = time // 3600
-                time %= 3600
-                minutes = time // 60
-                time %= 60
-                seconds = time
-
+            ctf = self.select_event(selection, upcoming)
+            if ctf is None:
                 await ctx.send(
-                    f"```ini\n{self.upcoming_l[x]['title']} starts in: [{days} days], [{hours} hours], [{minutes} minutes], [{seconds} seconds]```\n{self.upcoming_l[x]['url']}"
+                    f"No upcoming ctf matches `{selection}`, see >ctftime countdown for the list."
                 )
-            else:  # TODO: make this a function, too much repeated code here.
-                for ctf in ctfs.find():
-                    if isoparse(ctf["start"]).timestamp() > unix_now:
-                        self.upcoming_l.append(ctf)
-                x = int(params) - 1
-
-                time = isoparse(self.upcoming_l[x]["start"]).timestamp() - unix_now
-                days = time // (24 * 3600)
-                time = time % (24 * 3600)
-                hours = time // 3600
-                time %= 3600
-                minutes = time // 60
-                time %= 60
-                seconds = time
+                return
 
-                await ctx.send(
-                    f"```ini\n{self.upcoming_l[x]['title']} starts in: [{days} days], [{hours} hours], [{minutes} minutes], [{seconds} seconds]```\n{self.upcoming_l[x]['url']}"
-                )
+            await ctx.send(
+                f"```ini\n{ctf['title']} starts in: {time_window(ctf['start_ts'] - unix_now)}```\n{ctf['url']}"
+            )
 
 
-async def setup(bot: commands.Bot):
+async def setup(bot: NullCTFBot):
     await bot.add_cog(CTFTime(bot))
@@ -1,71 +1,183 @@
-from discord.ext import commands, tasks
-import discord
-from datetime import datetime
-import pytz
-import os
-
-# Uncomment for troubleshooting
-# import logging
-# logging.basicConfig(level=logging.DEBUG)
-# logger = logging.getLogger('CTFTimeScheduler')
-
-class CTFTimeScheduler(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.timezone = pytz.timezone('Asia/Kolkata')
-        self.weekly_announcement.start()
-        # For testing, uncomment below
-        # self.bot.loop.create_task(self.test_announcement())
-        
-    def cog_unload(self):
-        self.weekly_announcement.cancel()
-
-    async def _send_announcement(self):
-        try:
-            channel = self.bot.get_channel(int(os.getenv('ANNOUNCEMENT_CHANNEL_ID')))
-            if not channel:
-                return
-                
-            security_role = channel.guild.get_role(int(os.getenv('SECURITY_ROLE_ID')))
-            if not security_role:
-                return
-
-            ctftime_command = self.bot.get_command('ctftime')
-            if not ctftime_command:
-                return
-                
-            temp_message = await channel.send("Initializing CTF announcement...")
-            ctx = await self.bot.get_context(temp_message)
-            await temp_message.delete()
-            
-            # Fixed announcement with proper allowed_mentions
-            await channel.send(
-                f"Here are the upcoming CTFs {security_role.mention}!",
-                allowed_mentions=discord.AllowedMentions(roles=True)
-            )
-            
-            upcoming_command = ctftime_command.get_command('upcoming')
-            if upcoming_command:
-                await upcoming_command(ctx, 5)
-
-        except Exception as e:
-            print(f"Announcement error: {str(e)}")
-
-    @tasks.loop(minutes=1)
-    async def weekly_announcement(self):
-        current_time = datetime.now(self.timezone)
-        target_time = current_time.replace(hour=18, minute=00, second=0, microsecond=0)
-        
-        # Send announcement if it's Friday at target time
-        if current_time.weekday() == 4 and (
-            current_time.hour == target_time.hour and 
-            current_time.minute == target_time.minute
-        ):
-            await self._send_announcement()
-
-    @weekly_announcement.before_loop
-    async def before_weekly_announcement(self):
-        await self.bot.wait_until_ready()
-
-async def setup(bot):
-    await bot.add_cog(CTFTimeScheduler(bot))
\ No newline at end of file
+import asyncio
+import os
+import traceback
+from datetime import UTC, datetime, timedelta
+from typing import cast
+
+import discord
+from discord.ext import commands
+
+import config_vars
+import database
+from cogs.ctftime import CTFTime
+from common import EmbedData, GuildConfig, NullCTFBot, send_embeds
+from cron import CronSchedule
+
+# Weekly announcements of the upcoming CTFs, on a cron schedule configured per guild
+# (see the announcements and announcement_schedule config commands).
+# The scheduler sleeps until the earliest next run of any guild, and every successful run is
+# recorded, so a run missed while the bot was down is sent as soon as it is back.
+# Guilds due at the same time share one rendering of the cached events, sent to all of them
+# concurrently.
+
+# Uncomment for troubleshooting
+# import logging
+# logging.basicConfig(level=logging.DEBUG)
+# logger = logging.getLogger('CTFTimeScheduler')
+
+
+class CTFTimeScheduler(commands.Cog):
+    """
+    Scheduled announcements of upcoming CTFs.
+    """
+
+    # How long to wait before retrying a run that failed to send.
+    retry_delay = timedelta(minutes=10)
+    # The number of upcoming CTFs in an announcement (at most 10 embeds fit in a message).
+    announce_amount = 5
+
+    def __init__(self, bot: NullCTFBot):
+        self.bot = bot
+        self.next_runs: dict[int, datetime] = {}  # guild id -> next run, in UTC
+        self.wakeup = asyncio.Event()
+        self.scheduler: asyncio.Task[None] | None = None
+
+    async def cog_load(self):
+        await database.guild_configs.ensure_indexes()
+        await self.seed_from_env()
+        for conf in await database.guild_configs.announcing():
+            self.schedule(conf)
+        self.scheduler = asyncio.create_task(self.run())
+
+    async def cog_unload(self):
+        if self.scheduler is not None:
+            self.scheduler.cancel()
+
+    async def seed_from_env(self):
+        # The announcement channel and role used to be set in the environment, they become
+        # that guild's configuration unless it has one already.
+        channel_id = os.getenv("ANNOUNCEMENT_CHANNEL_ID", "")
+        channel = (
+            self.bot.get_channel(int(channel_id)) if channel_id.isdigit() else None
+        )
+        if not isinstance(channel, discord.TextChannel):
+            return
+        conf = await database.guild_configs.get(channel.guild.id)
+        if conf.announce_channel_id is not None:
+            return
+        role_id = os.getenv("SECURITY_ROLE_ID", "")
+        await database.guild_configs.set(
+            channel.guild.id,
+            {
+                "announce_channel_id": channel.id,
+                "announce_role_id": int(role_id) if role_id.isdigit() else None,
+                "announce_last_run": conf.announce_last_run or datetime.now(UTC),
+            },
+        )
+
+    def schedule(self, conf: GuildConfig, after: datetime | None = None):
+        self.next_runs.pop(conf.guild_id, None)
+        self.wakeup.set()
+        if conf.announce_channel_id is None:
+            return
+        # A run that was due while the bot was down is in the past, so it is run right away.
+        # The config commands reset the last run whenever the schedule or channel changes,
+        # so only runs of the schedule in effect can be missed.
+        last_run = after or conf.announce_last_run or datetime.now(UTC)
+        try:
+            cron = CronSchedule(conf.announce_cron, conf.announce_timezone)
+            self.next_runs[conf.guild_id] = cron.next_fire(last_run)
+        except ValueError as e:
+            # Only this guild goes without announcements.
+            print(f"Guild {conf.guild_id}: invalid announcement schedule, {e}")
+
+    @commands.Cog.listener()
+    async def on_announcement_schedule_changed(self, guild_id: int):
+        self.schedule(await database.guild_configs.get(guild_id))
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self.wakeup.clear()
+            now = datetime.now(UTC)
+            due = [g for g, t in self.next_runs.items() if t <= now]
+            if due:
+                try:
+                    await self.announce(due)
+                except Exception:
+                    traceback.print_exc()
+                    for guild_id in due:
+                        self.next_runs[guild_id] = now + self.retry_delay
+            # Sleep until the next run is due, or until a schedule changes.
+            timeout = None
+            if self.next_runs:
+                next_run = min(self.next_runs.values())
+                timeout = max((next_run - datetime.now(UTC)).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def announce(self, guild_ids: list[int]):
+        # Render once, then send the same message to every guild with a bounded number of
+        # sends in flight, discord.py waits out any rate limit it hits.
+        ctftime = cast(CTFTime | None, self.bot.get_cog("CTFTime"))
+        if ctftime is None:
+            raise RuntimeError("The ctftime extension is not loaded")
+        events = await ctftime.upcoming_events(self.announce_amount)
+        embeds = [ctftime.render(ctf).upcoming for ctf in events]
+
+        limit = asyncio.Semaphore(config_vars.ANNOUNCE_CONCURRENCY)
+
+        async def send(guild_id: int):
+            async with limit:
+                await self.run_guild(guild_id, embeds)
+
+        await asyncio.gather(*(send(guild_id) for guild_id in guild_ids))
+
+    async def run_guild(self, guild_id: int, embeds: list[EmbedData]):
+        conf = await database.guild_configs.get(guild_id)
+        now = datetime.now(UTC)
+        try:
+            sent = await self._send_announcement(conf, embeds)
+        except Exception:
+            traceback.print_exc()
+            self.next_runs[guild_id] = now + self.retry_delay
+            return
+        if sent:
+            await database.guild_configs.set(guild_id, {"announce_last_run": now})
+        else:
+            # There is nowhere to send it, skip this run without recording it.
+            print(f"Guild {guild_id}: announcement channel not found")
+        self.schedule(conf, after=now)
+
+    async def _send_announcement(
+        self, conf: GuildConfig, embeds: list[EmbedData]
+    ) -> bool:
+        if conf.announce_channel_id is None:
+            return False
+        channel = self.bot.get_channel(conf.announce_channel_id)
+        if not isinstance(channel, discord.TextChannel):
+            return False
+        role = (
+            channel.guild.get_role(conf.announce_role_id)
+            if conf.announce_role_id
+            else None
+        )
+
+        mention = f" {role.mention}" if role else ""
+        if embeds:
+            content = f"Here are the upcoming CTFs{mention}!"
+        else:
+            content = f"There are no upcoming CTFs on ctftime.org right now{mention}."
+        await send_embeds(
+            channel,
+            embeds,
+            content,
+            allowed_mentions=discord.AllowedMentions(roles=True),
+        )
+        return True
+
+
+async def setup(bot: NullCTFBot):
+    await bot.add_cog(CTFTimeScheduler(bot))
@@ -1,4 +1,4 @@
-from typing import Any, Generator, Mapping
+from typing import Any, Generator, Iterable, Iterator, Mapping
 
 import discord
 from discord.ext import commands
@@ -15,7 +15,7 @@ class PaginationView(discord.ui.View):
 
     def __init__(
         self,
-        data: EmbedData,
+        data: EmbedData | Iterable[EmbedData],
         ctx: Context,
         channnel: MessageableChannel,
         max_fields: int = 2,
@@ -25,8 +25,17 @@ class PaginationView(discord.ui.View):
         super().__init__()
         self.ctx = ctx
         self.channnel = channnel
-        pages: list[EmbedData] = []
+        # Either one embed to split into pages, or the pages themselves (e.g. a generator).
+        # Pages are only rendered once they are about to be shown.
+        if isinstance(data, EmbedData):
+            data = self.paginate(data, max_fields, field_txt_lim, total_txt_lim)
+        self._source = iter(data)
+        self._pages: list[discord.Embed] = []
 
+    @staticmethod
+    def paginate(
+        data: EmbedData, max_fields: int, field_txt_lim: int, total_txt_lim: int
+    ) -> Iterator[EmbedData]:
         def trav_data(data: EmbedData) -> Generator[FieldData, bool | None, None]:
             for field in data.fields:
                 for value in field:
@@ -35,10 +44,12 @@ class PaginationView(discord.ui.View):
 
         data_gen = trav_data(data)
         acc: FieldData | None = None
+        first = True
         while True:
             page = EmbedData(title=data.title)
-            if len(pages) == 0:
+            if first:
                 page.description = data.description
+                first = False
             for _ in range(max_fields):
                 page_len = len(page)
                 acc = next(data_gen, None)
@@ -61,16 +72,25 @@ class PaginationView(discord.ui.View):
                     pass
                 page.fields.append(acc)
 
-            pages.append(page)
+            yield page
             if next(data_gen, None) is None:
                 break
 
-        self._pages = list(map(lambda x: self.create_embed(x), pages))
-
-    async def send(self):
+    def _load(self, count: int) -> bool:
+        # Render pages until there are `count` of them, False if the source runs out first.
+        while len(self._pages) < count:
+            page = next(self._source, None)
+            if page is None:
+                return False
+            self._pages.append(self.create_embed(page))
+        return True
+
+    async def send(self) -> bool:
+        # Returns False if there was nothing to send.
+        self._load(2)
         match (len(self._pages)):
             case 0:
-                return
+                return False
             case 1:
                 await self.channnel.send(embed=self._pages[0])
             case _:
@@ -78,23 +98,14 @@ class PaginationView(discord.ui.View):
                 self.message = await self.channnel.send(
                     embed=self._pages[self._cur_page_idx], view=self
                 )
+        return True
 
     async def update_message(self):
         self.update_buttons()
         await self.message.edit(embed=self._pages[self._cur_page_idx], view=self)
 
     def create_embed(self, page: EmbedData):
-        emb = discord.Embed(
-            title=page.title,
-            description=page.description,
-            color=page.color,
-        )
-        for field in page.fields:
-            emb.add_field(
-                name=field.name,
-                value=field.value,
-                inline=field.inline,
-            )
+        emb = page.to_embed()
         if self.ctx.bot.user and self.ctx.bot.user.avatar:
             emb.set_thumbnail(url=f"{self.ctx.bot.user.avatar.url}")
         return emb
@@ -111,7 +122,7 @@ class PaginationView(discord.ui.View):
             self.first_page_button.style = discord.ButtonStyle.green
             self.prev_button.style = discord.ButtonStyle.primary
 
-        if self._cur_page_idx == len(self._pages) - 1:
+        if not self._load(self._cur_page_idx + 2):
             self.next_button.disabled = True
             self.last_page_button.disabled = True
             self.last_page_button.style = discord.ButtonStyle.gray
@@ -125,7 +136,7 @@ class PaginationView(discord.ui.View):
     @discord.ui.button(label="|<", style=discord.ButtonStyle.green)
     async def first_page_button(self, interaction: discord.Interaction, _):
         await interaction.response.defer()
-        self._cur_page_idx = 1
+        self._cur_page_idx = 0
 
         await self.update_message()
 
@@ -144,6 +155,7 @@ class PaginationView(discord.ui.View):
     @discord.ui.button(label=">|", style=discord.ButtonStyle.green)
     async def last_page_button(self, interaction: discord.Interaction, _):
         await interaction.response.defer()
+        self._pages.extend(map(self.create_embed, self._source))
         self._cur_page_idx = len(self._pages) - 1
         await self.update_message()
 
@@ -0,0 +1,322 @@
+import asyncio
+import heapq
+import itertools
+import traceback
+from datetime import UTC
+from time import time
+
+import discord
+from bson import ObjectId
+from dateutil.parser import isoparse  # pip install python-dateutil
+from discord.ext import commands
+
+import config_vars
+import database
+from cogs.ctftime import CTFTime
+from common import Context, EventT, NullCTFBot, ReminderT
+
+# Reminders for when a CTF starts and when it is about to end, sent to the channels that
+# subscribed to them. A channel can follow any CTFtime event, and a ctf channel can also
+# set the times of its own CTF.
+# Every pending reminder sits in a min-heap ordered by fire time, and the scheduler sleeps
+# until the earliest one is due instead of polling.
+
+
+def fire_times(reminder: ReminderT) -> list[tuple[int, str]]:
+    # (fire time, kind) of every reminder for a CTF, in the order they are sent.
+    ending = max(
+        reminder["finish_ts"] - config_vars.REMINDER_ENDING_LEAD, reminder["start_ts"]
+    )
+    return [(reminder["start_ts"], "start"), (ending, "ending")]
+
+
+def parse_time(value: str) -> int:
+    # A unix timestamp or an ISO 8601 date, in UTC unless it says otherwise.
+    if value.isdigit():
+        return int(value)
+    try:
+        date = isoparse(value)
+    except ValueError:
+        raise commands.BadArgument(
+            f"`{value}` is not a unix timestamp or an ISO 8601 date (e.g. 2025-01-31T18:00)."
+        )
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=UTC)
+    return int(date.timestamp())
+
+
+class Reminders(commands.Cog):
+    """
+    Reminders for when CTFs start and are about to end.
+    """
+
+    def __init__(self, bot: NullCTFBot):
+        super().__init__()
+        self.bot = bot
+        self.pending: dict[ObjectId, ReminderT] = {}
+        # (fire time, sequence, reminder id, kind). Entries are never removed from the middle,
+        # ones whose reminder was removed or rescheduled are skipped when they come up.
+        self.heap: list[tuple[int, int, ObjectId, str]] = []
+        self.sequence = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.scheduler: asyncio.Task[None] | None = None
+
+    async def cog_load(self):
+        await database.reminders.ensure_indexes()
+        await database.reminders.delete_finished(int(time()))
+        for reminder in await database.reminders.all():
+            self.pending[reminder["_id"]] = reminder
+        self.rebuild()
+        self.scheduler = asyncio.create_task(self.run())
+
+    async def cog_unload(self):
+        if self.scheduler is not None:
+            self.scheduler.cancel()
+
+    def push(self, reminder: ReminderT):
+        for fire_at, kind in fire_times(reminder):
+            if kind not in reminder["sent"]:
+                heapq.heappush(
+                    self.heap, (fire_at, next(self.sequence), reminder["_id"], kind)
+                )
+        self.wakeup.set()
+
+    def rebuild(self):
+        self.heap = []
+        for reminder in self.pending.values():
+            self.push(reminder)
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self.wakeup.clear()
+            while self.heap and self.heap[0][0] <= time():
+                _, _, reminder_id, kind = heapq.heappop(self.heap)
+                try:
+                    await self.fire(reminder_id, kind)
+                except Exception:
+                    traceback.print_exc()
+            # Sleep until the next reminder is due, or until one is added or rescheduled.
+            timeout = self.heap[0][0] - time() if self.heap else None
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def forget(self, reminder_id: ObjectId):
+        self.pending.pop(reminder_id, None)
+        await database.reminders.delete(reminder_id)
+
+    async def fire(self, reminder_id: ObjectId, kind: str):
+        reminder = self.pending.get(reminder_id)
+        if reminder is None or kind in reminder["sent"]:
+            return
+        now = int(time())
+        fire_at = next(t for t, k in fire_times(reminder) if k == kind)
+        if fire_at > now:
+            return  # rescheduled to later, its new entry is still in the heap
+        if reminder["finish_ts"] <= now:
+            # Missed while the bot was down, it's too late for any reminder.
+            await self.forget(reminder_id)
+            return
+
+        channel = self.bot.get_channel(reminder["channel_id"])
+        if not isinstance(channel, discord.abc.Messageable):
+            await self.forget(reminder_id)
+            return
+        mention = f"<@&{reminder['role_id']}> " if "role_id" in reminder else ""
+        if kind == "start":
+            message = f"{mention}:triangular_flag_on_post: **{reminder['title']}** has started! It ends <t:{reminder['finish_ts']}:R>."
+        else:
+            message = f"{mention}:hourglass: **{reminder['title']}** ends <t:{reminder['finish_ts']}:R>!"
+        if reminder["url"]:
+            message += f"\n{reminder['url']}"
+        await channel.send(
+            message, allowed_mentions=discord.AllowedMentions(roles=True)
+        )
+
+        reminder["sent"].append(kind)
+        if len(reminder["sent"]) == len(fire_times(reminder)):
+            await self.forget(reminder_id)
+        else:
+            await database.reminders.mark_sent(reminder_id, kind)
+
+    async def subscribe(
+        self, ctx: Context, event_id: int | None, info: dict[str, object]
+    ) -> ReminderT:
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage
+        reminder = await database.reminders.subscribe(
+            ctx.guild.id, ctx.channel.id, event_id, info
+        )
+        self.pending[reminder["_id"]] = reminder
+        self.push(reminder)
+        return reminder
+
+    @commands.Cog.listener()
+    async def on_ctftime_events_changed(self, events: list[EventT]):
+        # updateDB found events whose content changed, follow the ones whose times moved.
+        moved = False
+        for event in events:
+            subscribed = [
+                r for r in self.pending.values() if r["event_id"] == event["id"]
+            ]
+            if not any(
+                (r["start_ts"], r["finish_ts"])
+                != (event["start_ts"], event["finish_ts"])
+                for r in subscribed
+            ):
+                continue
+            await database.reminders.set_times(
+                event["id"], event["start_ts"], event["finish_ts"]
+            )
+            for reminder in subscribed:
+                reminder["start_ts"] = event["start_ts"]
+                reminder["finish_ts"] = event["finish_ts"]
+                reminder["sent"] = []
+            moved = True
+        if moved:
+            self.rebuild()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        gone = [
+            reminder_id
+            for reminder_id, r in self.pending.items()
+            if r["channel_id"] == channel.id
+        ]
+        if gone:
+            for reminder_id in gone:
+                del self.pending[reminder_id]
+            await database.reminders.delete_channel(channel.guild.id, channel.id)
+
+    @commands.guild_only()
+    @commands.group(aliases=["remind", "reminder"])
+    async def reminders(self, ctx: Context):
+        """
+        Command group for reminders of when CTFs start and end.
+        """
+        if ctx.invoked_subcommand is None:
+            # If the subcommand passed does not exist, its type is None
+            commands = list(
+                set([f"`{c.qualified_name}`" for c in self.walk_commands()][1:])
+            )
+            # update this to include params
+            await ctx.send(
+                f"Unknown command. Possible values: {', '.join(commands)}\n"
+                "See `help` for more information."
+            )
+
+    @reminders.command(aliases=["follow"])
+    async def ctftime(self, ctx: Context, *, selection: str):
+        """
+        remind this channel when an upcoming ctf from ctftime.org starts and is about to end.
+
+        Parameters
+        ----------
+        selection : str
+            The number of the ctf in >ctftime countdown, its CTFtime event id, or the start of its title
+        """
+        upcoming = await database.events.upcoming(int(time()))
+        event = CTFTime.select_event(selection, upcoming)
+        if event is None:
+            await ctx.send(
+                f"No upcoming ctf matches `{selection}`, see >ctftime countdown for the list."
+            )
+            return
+        await self.subscribe(
+            ctx,
+            event["id"],
+            {
+                "title": event["title"],
+                "url": event["url"],
+                "start_ts": event["start_ts"],
+                "finish_ts": event["finish_ts"],
+            },
+        )
+        await ctx.send(
+            f"This channel will be reminded when **{event['title']}** starts <t:{event['start_ts']}:R>."
+        )
+
+    @reminders.command(name="set")
+    async def set_times(self, ctx: Context, start: str, finish: str):
+        """
+        remind the ctf role when this channel's ctf starts and is about to end.
+
+        Parameters
+        ----------
+        start : str
+            When the ctf starts, as a unix timestamp or an ISO 8601 date (UTC by default)
+        finish : str
+            When the ctf ends, in the same format
+        """
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage
+        ctf = await database.teams.find(ctx.guild.id, ctx.channel.id)
+        if ctf is None:
+            await ctx.send("You must be in a created ctf channel to use ctf commands!")
+            return
+        start_ts, finish_ts = parse_time(start), parse_time(finish)
+        if finish_ts <= max(start_ts, int(time())):
+            raise commands.BadArgument(
+                "The ctf must end after it starts, and in the future."
+            )
+
+        info: dict[str, object] = {
+            "title": ctf["name"],
+            "url": "",
+            "start_ts": start_ts,
+            "finish_ts": finish_ts,
+        }
+        if "role_id" in ctf:
+            info["role_id"] = ctf["role_id"]
+        await self.subscribe(ctx, None, info)
+        await ctx.send(f"Reminders set for <t:{start_ts}:F> -> <t:{finish_ts}:F>.")
+
+    @reminders.command(name="list", aliases=["ls"])
+    async def list_reminders(self, ctx: Context):
+        """
+        list the reminders of this server.
+        """
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage
+        reminders = await database.reminders.for_guild(ctx.guild.id)
+        if not reminders:
+            await ctx.send(
+                "No reminders set! Use >reminders ctftime or >reminders set."
+            )
+            return
+
+        lines = ""
+        for i, r in enumerate(reminders):
+            line = f"\n[{i + 1}] **{r['title']}** in <#{r['channel_id']}>: <t:{r['start_ts']}:f> -> <t:{r['finish_ts']}:f>"
+            # Discord message sizes cannot exceed 2000 characters.
+            if len(lines) + len(line) > 1900:
+                break
+            lines += line
+        await ctx.send(f"Type >reminders remove <number> to remove one.{lines}")
+
+    @reminders.command(name="remove", aliases=["rm"])
+    async def remove_reminder(self, ctx: Context, number: int):
+        """
+        remove a reminder of this server.
+
+        Parameters
+        ----------
+        number : int
+            The number of the reminder in >reminders list
+        """
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage
+        reminders = await database.reminders.for_guild(ctx.guild.id)
+        if not 1 <= number <= len(reminders):
+            await ctx.send("No such reminder, see >reminders list.")
+            return
+        reminder = reminders[number - 1]
+        # Its heap entries are skipped once they come up.
+        await self.forget(reminder["_id"])
+        await ctx.message.add_reaction("✅")
+
+
+async def setup(bot: NullCTFBot):
+    await bot.add_cog(Reminders(bot))
@@ -1,8 +1,13 @@
-from typing import NotRequired, TypedDict, Union, Unpack
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Iterator, NotRequired, TypedDict, Union, Unpack
 
 import discord
+from bson import ObjectId
 from discord.ext import commands
 
+from web import WebClient
+
 Context = commands.Context[commands.Bot | commands.AutoShardedBot]
 PartialMessageableChannel = Union[
     discord.TextChannel,
@@ -15,20 +20,108 @@ PartialMessageableChannel = Union[
 MessageableChannel = Union[PartialMessageableChannel, discord.GroupChannel]
 
 
+class NullCTFBot(commands.Bot):
+    """
+    The bot, along with the resources it shares between cogs.
+    """
+
+    web: WebClient
+
+    async def setup_hook(self):
+        self.web = WebClient()
+
+    async def close(self):
+        await super().close()
+        if hasattr(self, "web"):
+            await self.web.close()
+
+
 class DurationT(TypedDict):
     hours: int
     days: int
 
 
 class EventT(TypedDict):
+    id: int
     title: str
-    start: str
-    finish: str
+    start: datetime
+    finish: datetime
+    start_ts: int
+    finish_ts: int
     duration: DurationT
     url: str
     logo: str
     format: str
     onsite: bool
+    weight: float
+    hash: NotRequired[str]
+
+
+class LeaderboardT(TypedDict):
+    year: int
+    teams: list[dict[str, Any]]
+    lines: list[str]
+    fetched_at: datetime
+    final: bool
+
+
+class CTFT(TypedDict):
+    guild_id: int
+    channel_id: int
+    name: str
+    text_channel: NotRequired[str]
+    role_id: NotRequired[int]
+    category_id: NotRequired[int]
+    challenges: NotRequired[dict[str, str]]
+
+
+class GuildConfigT(TypedDict):
+    guild_id: int
+    ctf_category: NotRequired[str]
+    ctf_category_id: NotRequired[int]
+    archive_category: NotRequired[str]
+    archive_category_id: NotRequired[int]
+    announce_channel_id: NotRequired[int | None]
+    announce_role_id: NotRequired[int | None]
+    announce_cron: NotRequired[str]
+    announce_timezone: NotRequired[str]
+    announce_last_run: NotRequired[datetime]
+
+
+class ReminderT(TypedDict):
+    _id: ObjectId  # always stored, reminders are only created by upserts
+    guild_id: int
+    channel_id: int
+    event_id: int | None  # CTFtime event id, None for a ctf channel's own times
+    role_id: NotRequired[int]
+    title: str
+    url: str
+    start_ts: int
+    finish_ts: int
+    sent: list[str]  # kinds of reminder already sent
+
+
+@dataclass
+class GuildConfig:
+    guild_id: int
+    ctf_category: str = "CTF"
+    ctf_category_id: int | None = None
+    archive_category: str = "ARCHIVE"
+    archive_category_id: int | None = None
+    # Weekly upcoming CTF announcements, sent when announce_cron fires in announce_timezone.
+    announce_channel_id: int | None = None
+    announce_role_id: int | None = None
+    announce_cron: str = "0 18 * * 5"
+    announce_timezone: str = "Asia/Kolkata"
+    announce_last_run: datetime | None = None
+
+
+def time_window(seconds: int) -> str:
+    # Relative time in the form "[1 days], [2 hours], [3 minutes], [4 seconds]".
+    days, seconds = divmod(max(seconds, 0), 24 * 3600)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"[{days} days], [{hours} hours], [{minutes} minutes], [{seconds} seconds]"
 
 
 class FieldDataT(TypedDict):
@@ -97,6 +190,7 @@ class EmbedDataT(TypedDict):
     description: NotRequired[str]
     color: NotRequired[discord.Color]
     fields: NotRequired[list[FieldDataT]]
+    thumbnail: NotRequired[str]
 
 
 class EmbedData:
@@ -104,6 +198,7 @@ class EmbedData:
     description: str
     color: discord.Color
     fields: list[FieldData] = []
+    thumbnail: str
 
     def __init__(
         self,
@@ -113,6 +208,7 @@ class EmbedData:
         self.description = kwargs.get("description", "")
         self.color = kwargs.get("color", discord.Color.blue())
         self.fields = [FieldData(**field) for field in kwargs.get("fields", [])]
+        self.thumbnail = kwargs.get("thumbnail", "")
 
     def __len__(self):
         return (
@@ -120,3 +216,64 @@ class EmbedData:
             + len(self.description)
             + sum(len(field) for field in self.fields)
         )
+
+    def to_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=self.title, description=self.description, color=self.color
+        )
+        if self.thumbnail:
+            embed.set_thumbnail(url=self.thumbnail)
+        for field in self.fields:
+            embed.add_field(name=field.name, value=field.value, inline=field.inline)
+        return embed
+
+
+# Discord's limits on the embeds of a single message.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_TEXT_PER_MESSAGE = 6000
+
+
+def batch_embeds(embeds: Iterable[EmbedData]) -> Iterator[list[discord.Embed]]:
+    # Pack the embeds into as few messages as Discord allows, in order.
+    batch: list[discord.Embed] = []
+    batch_len = 0
+    for data in embeds:
+        if batch and (
+            len(batch) == MAX_EMBEDS_PER_MESSAGE
+            or batch_len + len(data) > MAX_EMBED_TEXT_PER_MESSAGE
+        ):
+            yield batch
+            batch, batch_len = [], 0
+        batch.append(data.to_embed())
+        batch_len += len(data)
+    if batch:
+        yield batch
+
+
+async def send_embeds(
+    channel: discord.abc.Messageable,
+    embeds: Iterable[EmbedData],
+    content: str | None = None,
+    **kwargs: Any,
+) -> list[discord.Message]:
+    """
+    Send embeds in as few messages as possible.
+
+    Parameters
+    ----------
+    channel : discord.abc.Messageable
+        Where to send the embeds.
+    embeds : Iterable[EmbedData]
+        The embeds, sent in order.
+    content : str | None
+        Text sent along with the first message.
+    **kwargs : Any
+        Passed on to every send (e.g. allowed_mentions).
+    """
+    messages: list[discord.Message] = []
+    for batch in batch_embeds(embeds):
+        messages.append(await channel.send(content, embeds=batch, **kwargs))
+        content = None
+    if content is not None:
+        messages.append(await channel.send(content, **kwargs))
+    return messages
@@ -2,10 +2,10 @@ import os
 from typing import Any, Dict
 
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from pymongo.collection import Collection
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
 
-from common import EventT
+from common import CTFT, EventT, GuildConfigT, LeaderboardT, ReminderT
 
 load_dotenv()
 
@@ -23,14 +23,48 @@ if DISCORD_TOKEN == "" and MONGODB_CONNECTION == "":
 
 DEFAULT_PREFIX = "$"
 
+# Size of the MongoDB connection pool shared by every cog.
+MONGODB_POOL_SIZE = int(os.getenv("MONGODB_POOL_SIZE", "50"))
 
-client: MongoClient[Dict[str, Any]] = MongoClient(MONGODB_CONNECTION)
+# Number of guild configurations kept in memory, should be at least the number of guilds.
+GUILD_CONFIG_CACHE_SIZE = int(os.getenv("GUILD_CONFIG_CACHE_SIZE", "1000"))
+
+# Seconds the cached CTFtime events are served as is, before a command triggers a background refresh.
+CTFTIME_FRESHNESS = int(os.getenv("CTFTIME_FRESHNESS", "1800"))
+# How many days ahead of now CTFtime events are cached.
+CTFTIME_HORIZON_DAYS = int(os.getenv("CTFTIME_HORIZON_DAYS", "60"))
+# Seconds the current year's CTFtime leaderboard is cached, finished years are cached forever.
+CTFTIME_LEADERBOARD_TTL = int(os.getenv("CTFTIME_LEADERBOARD_TTL", "3600"))
+# How many guilds a scheduled announcement is sent to at once.
+ANNOUNCE_CONCURRENCY = int(os.getenv("ANNOUNCE_CONCURRENCY", "5"))
+# Seconds before a CTF ends that its "ending soon" reminder is sent.
+REMINDER_ENDING_LEAD = int(os.getenv("REMINDER_ENDING_LEAD", "3600"))
+
+
+client: AsyncMongoClient[Dict[str, Any]] = AsyncMongoClient(
+    MONGODB_CONNECTION, maxPoolSize=MONGODB_POOL_SIZE, tz_aware=True
+)
 
 ctfdb = client["ctftime"]  # Create ctftime database
-ctfs: Collection[EventT] = ctfdb[
+ctfs: AsyncCollection[EventT] = ctfdb[
     "ctfs"
 ]  # pyright: ignore[reportAssignmentType] | Create ctfs collection
+leaderboards: AsyncCollection[LeaderboardT] = ctfdb[
+    "leaderboards"
+]  # pyright: ignore[reportAssignmentType] | CTFtime leaderboards by year
 
 teamdb = client["ctfteams"]  # Create ctf teams database
+# All ctf channels of every guild, keyed by (guild_id, channel_id)
+ctfs_by_channel: AsyncCollection[CTFT] = teamdb[
+    "ctfs_by_channel"
+]  # pyright: ignore[reportAssignmentType]
+# Start/end reminders subscribed to by ctf channels
+reminders: AsyncCollection[ReminderT] = teamdb[
+    "reminders"
+]  # pyright: ignore[reportAssignmentType]
 
 serverdb = client["serverinfo"]  # configuration db
+# One configuration document per guild, keyed by guild_id
+guild_config: AsyncCollection[GuildConfigT] = serverdb[
+    "guild_config"
+]  # pyright: ignore[reportAssignmentType]
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, tzinfo
+
+import pytz
+
+# A small cron expression parser, for schedules stored per guild in the database.
+# Supports the five standard fields (minute hour day-of-month month day-of-week) with
+# "*", numbers, ranges "a-b", steps "*/n" or "a-b/n" and lists "a,b,c".  Sunday is 0 or 7.
+
+
+class CronSchedule:
+    """
+    A parsed cron expression, evaluated in a timezone.
+
+    Parameters
+    ----------
+    expression : str
+        The cron expression, e.g. "0 18 * * 5" for every Friday at 18:00
+    timezone : str
+        The name of the timezone the expression is in, e.g. "Asia/Kolkata"
+
+    Raises
+    ------
+    ValueError
+        If the expression or the timezone is invalid.
+    """
+
+    # (lowest, highest) value of every field
+    _bounds = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str, timezone: str = "UTC"):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"`{expression}` must have 5 fields")
+        try:
+            self.timezone: tzinfo = pytz.timezone(timezone)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"`{timezone}` is not a known timezone")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(part, low, high)
+            for part, (low, high) in zip(parts, self._bounds)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        # Like cron, when both days are restricted a time matches if either of them does.
+        self._any_day = parts[2] != "*" and parts[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set[int]:
+        values: set[int] = set()
+        for item in field.split(","):
+            span, _, step = item.partition("/")
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                first, _, last = span.partition("-")
+                start, end = int(first), int(last)
+            else:
+                start = end = int(span)
+                if step:
+                    end = high
+            if step and int(step) < 1:
+                raise ValueError(f"The step of `{item}` must be at least 1")
+            if not low <= start <= end <= high:
+                raise ValueError(f"`{item}` is out of range {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, date: datetime) -> bool:
+        day = date.day in self.days
+        weekday = (date.weekday() + 1) % 7 in self.weekdays
+        return day or weekday if self._any_day else day and weekday
+
+    def next_fire(self, after: datetime) -> datetime:
+        """
+        The first time strictly after `after` that matches the expression, in UTC.
+        """
+        local = after.astimezone(self.timezone).replace(tzinfo=None)
+        date = local.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Every expression matches at least once in 5 years (Feb 29th needs a leap year).
+        limit = date + timedelta(days=5 * 366)
+        while date < limit:
+            if date.month not in self.months:
+                date = (date.replace(day=1) + timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(date):
+                date = date.replace(hour=0, minute=0) + timedelta(days=1)
+            elif date.hour not in self.hours:
+                date = date.replace(minute=0) + timedelta(hours=1)
+            elif date.minute not in self.minutes:
+                date += timedelta(minutes=1)
+            else:
+                fire = self.timezone.localize(date)  # type: ignore[attr-defined]
+                return fire.astimezone(pytz.utc)
+        raise ValueError(f"`{self.expression}` never matches")
@@ -0,0 +1,301 @@
+from dataclasses import fields
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+
+import config_vars
+from cache import LRUCache
+from common import (
+    CTFT,
+    EventT,
+    GuildConfig,
+    GuildConfigT,
+    LeaderboardT,
+    ReminderT,
+)
+
+# Async repositories over the MongoDB collections in config_vars.
+# Cogs go through these instead of touching the collections directly, so no
+# database round-trip ever blocks the event loop.
+
+
+class CTFRepository:
+    """
+    CTF channels and their challenges, one document per (guild, channel).
+    """
+
+    def __init__(self, collection: AsyncCollection[CTFT]):
+        self._collection = collection
+
+    async def ensure_indexes(self):
+        await self._collection.create_index(
+            [("guild_id", ASCENDING), ("channel_id", ASCENDING)], unique=True
+        )
+
+    @staticmethod
+    def _key(guild_id: int, channel_id: int) -> dict[str, int]:
+        return {"guild_id": guild_id, "channel_id": channel_id}
+
+    async def channel_ids(self) -> list[int]:
+        return await self._collection.distinct("channel_id")
+
+    async def find(self, guild_id: int, channel_id: int) -> CTFT | None:
+        return await self._collection.find_one(self._key(guild_id, channel_id))
+
+    async def update(self, guild_id: int, channel_id: int, info: dict[str, Any]):
+        await self._collection.update_one(
+            self._key(guild_id, channel_id), {"$set": info}, upsert=True
+        )
+
+    async def set_challenges(
+        self, guild_id: int, channel_id: int, challenges: dict[str, str]
+    ):
+        # Only the given challenge paths are written, so concurrent updates to other
+        # challenges in the same CTF never overwrite each other.
+        if not challenges:
+            return
+        await self._collection.update_one(
+            self._key(guild_id, channel_id),
+            {"$set": {f"challenges.{k}": v for k, v in challenges.items()}},
+            upsert=True,
+        )
+
+    async def remove_challenges(
+        self, guild_id: int, channel_id: int, challenges: list[str]
+    ):
+        if not challenges:
+            return
+        await self._collection.update_one(
+            self._key(guild_id, channel_id),
+            {"$unset": {f"challenges.{k}": "" for k in challenges}},
+        )
+
+    async def delete(self, guild_id: int, channel_id: int):
+        await self._collection.delete_one(self._key(guild_id, channel_id))
+
+
+class GuildConfigRepository:
+    """
+    Per-guild configuration settings, one document per guild.
+
+    Reads are served from an LRU cache, and every write goes through it, so a cached
+    configuration is never stale.
+    """
+
+    def __init__(self, collection: AsyncCollection[GuildConfigT], cache_size: int):
+        self._collection = collection
+        self._cache: LRUCache[int, GuildConfig] = LRUCache(cache_size)
+
+    async def ensure_indexes(self):
+        await self._collection.create_index("guild_id", unique=True)
+
+    @staticmethod
+    def _from_doc(guild_id: int, doc: GuildConfigT | None) -> GuildConfig:
+        conf = GuildConfig(guild_id)
+        for field in fields(GuildConfig):
+            if doc and field.name in doc:
+                setattr(conf, field.name, doc[field.name])
+        return conf
+
+    async def prefetch(self, guild_ids: list[int]):
+        guild_ids = guild_ids[: self._cache.maxsize]
+        docs = {
+            doc["guild_id"]: doc
+            async for doc in self._collection.find({"guild_id": {"$in": guild_ids}})
+        }
+        for guild_id in guild_ids:
+            self._cache.set(guild_id, self._from_doc(guild_id, docs.get(guild_id)))
+
+    async def announcing(self) -> list[GuildConfig]:
+        # Every guild with an announcement channel, loaded into the cache as well.
+        confs: list[GuildConfig] = []
+        async for doc in self._collection.find({"announce_channel_id": {"$ne": None}}):
+            conf = self._cache.get(doc["guild_id"]) or self._from_doc(
+                doc["guild_id"], doc
+            )
+            self._cache.set(conf.guild_id, conf)
+            confs.append(conf)
+        return confs
+
+    async def get(self, guild_id: int) -> GuildConfig:
+        conf = self._cache.get(guild_id)
+        if conf is None:
+            doc = await self._collection.find_one({"guild_id": guild_id})
+            conf = self._from_doc(guild_id, doc)
+            self._cache.set(guild_id, conf)
+        return conf
+
+    async def set(self, guild_id: int, info: dict[str, Any]):
+        await self._collection.update_one(
+            {"guild_id": guild_id}, {"$set": info}, upsert=True
+        )
+        conf = self._cache.get(guild_id)
+        if conf is None:
+            conf = await self.get(guild_id)
+        else:
+            for key, value in info.items():
+                setattr(conf, key, value)
+
+
+class EventRepository:
+    """
+    Local cache of CTFtime events, keyed by their CTFtime event id.
+    """
+
+    def __init__(self, collection: AsyncCollection[EventT]):
+        self._collection = collection
+
+    async def ensure_indexes(self):
+        # Documents from before events were keyed by id would break the unique index,
+        # they are only a cache so they can simply go.
+        await self._collection.delete_many({"id": {"$exists": False}})
+        await self._collection.create_index("id", unique=True)
+        # MongoDB removes events on its own once they are over.
+        await self._collection.create_index("finish", expireAfterSeconds=0)
+        await self._collection.create_index(
+            [("start_ts", ASCENDING), ("id", ASCENDING)]
+        )
+        await self._collection.create_index(
+            [("finish_ts", ASCENDING), ("start_ts", ASCENDING)]
+        )
+
+    async def running(self, now: int) -> list[EventT]:
+        # start <= now < finish, served by the (finish_ts, start_ts) index.
+        return (
+            await self._collection.find(
+                {"finish_ts": {"$gt": now}, "start_ts": {"$lte": now}}
+            )
+            .sort("start_ts", ASCENDING)
+            .to_list(None)
+        )
+
+    async def upcoming(self, now: int, limit: int = 0) -> list[EventT]:
+        return (
+            await self._collection.find({"start_ts": {"$gt": now}})
+            .sort([("start_ts", ASCENDING), ("id", ASCENDING)])
+            .limit(limit)
+            .to_list(None)
+        )
+
+    async def hashes(self, ids: list[int]) -> dict[int, str]:
+        return {
+            doc["id"]: doc.get("hash", "")
+            async for doc in self._collection.find(
+                {"id": {"$in": ids}}, {"id": True, "hash": True}
+            )
+        }
+
+    async def upsert_many(self, events: list[EventT]):
+        if not events:
+            return
+        await self._collection.bulk_write(
+            [
+                UpdateOne({"id": event["id"]}, {"$set": event}, upsert=True)
+                for event in events
+            ],
+            ordered=False,
+        )
+
+    async def delete_finished(self, now: datetime):
+        # The TTL monitor only runs once a minute, this makes expiry exact.
+        await self._collection.delete_many({"finish": {"$lt": now}})
+
+
+class LeaderboardRepository:
+    """
+    CTFtime leaderboards by year, with their pre-rendered lines.
+    """
+
+    def __init__(self, collection: AsyncCollection[LeaderboardT]):
+        self._collection = collection
+
+    async def ensure_indexes(self):
+        await self._collection.create_index("year", unique=True)
+
+    async def get(self, year: int) -> LeaderboardT | None:
+        return await self._collection.find_one({"year": year}, {"_id": False})
+
+    async def set(self, entry: LeaderboardT):
+        await self._collection.update_one(
+            {"year": entry["year"]}, {"$set": entry}, upsert=True
+        )
+
+
+class ReminderRepository:
+    """
+    CTF start/end reminders, one document per (guild, channel, CTFtime event).
+    """
+
+    def __init__(self, collection: AsyncCollection[ReminderT]):
+        self._collection = collection
+
+    async def ensure_indexes(self):
+        await self._collection.create_index(
+            [
+                ("guild_id", ASCENDING),
+                ("channel_id", ASCENDING),
+                ("event_id", ASCENDING),
+            ],
+            unique=True,
+        )
+        await self._collection.create_index(
+            [("guild_id", ASCENDING), ("start_ts", ASCENDING)]
+        )
+        await self._collection.create_index("finish_ts")
+
+    async def all(self) -> list[ReminderT]:
+        return await self._collection.find().to_list(None)
+
+    async def for_guild(self, guild_id: int) -> list[ReminderT]:
+        return (
+            await self._collection.find({"guild_id": guild_id})
+            .sort([("start_ts", ASCENDING), ("_id", ASCENDING)])
+            .to_list(None)
+        )
+
+    async def subscribe(
+        self, guild_id: int, channel_id: int, event_id: int | None, info: dict[str, Any]
+    ) -> ReminderT:
+        # Subscribing again replaces the times and starts the reminders over.
+        reminder = await self._collection.find_one_and_update(
+            {"guild_id": guild_id, "channel_id": channel_id, "event_id": event_id},
+            {"$set": {**info, "sent": []}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        assert reminder is not None
+        return reminder
+
+    async def mark_sent(self, reminder_id: ObjectId, kind: str):
+        await self._collection.update_one(
+            {"_id": reminder_id}, {"$addToSet": {"sent": kind}}
+        )
+
+    async def set_times(self, event_id: int, start_ts: int, finish_ts: int):
+        await self._collection.update_many(
+            {"event_id": event_id},
+            {"$set": {"start_ts": start_ts, "finish_ts": finish_ts, "sent": []}},
+        )
+
+    async def delete(self, reminder_id: ObjectId):
+        await self._collection.delete_one({"_id": reminder_id})
+
+    async def delete_channel(self, guild_id: int, channel_id: int):
+        await self._collection.delete_many(
+            {"guild_id": guild_id, "channel_id": channel_id}
+        )
+
+    async def delete_finished(self, now: int):
+        await self._collection.delete_many({"finish_ts": {"$lte": now}})
+
+
+teams = CTFRepository(config_vars.ctfs_by_channel)
+guild_configs = GuildConfigRepository(
+    config_vars.guild_config, config_vars.GUILD_CONFIG_CACHE_SIZE
+)
+events = EventRepository(config_vars.ctfs)
+leaderboards = LeaderboardRepository(config_vars.leaderboards)
+reminders = ReminderRepository(config_vars.reminders)
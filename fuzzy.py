@@ -0,0 +1,141 @@
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Iterable
+
+# Fuzzy name lookup, used to resolve partial or misspelled challenge names.
+# Names are normalized to lowercase alphanumeric tokens, and compared by the trigrams of
+# those tokens through an inverted index, so a lookup only touches names sharing a trigram.
+
+# The "<category>" prefix of pulled challenge names, rarely typed when naming a challenge.
+CATEGORY = re.compile(r"^\s*<[^>]*>\s*")
+
+
+def normalize(name: str) -> list[str]:
+    # "<Crypto> RSA-baby!" -> ["crypto", "rsa", "baby"]
+    return re.findall(r"[a-z0-9]+", name.casefold())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Fuzzy lookup of names by their tokens and trigram similarity.
+
+    Parameters
+    ----------
+    names : Iterable[str]
+        The names to look up.
+    """
+
+    # Names scoring below this are not considered a match at all.
+    min_score = 0.25
+    # Only names this close, or that the query is a partial name of, are picked without asking.
+    sure_score = 0.6
+    # The best name is picked outright when it scores this much more than the next one.
+    clear_lead = 0.15
+    # The most names offered when a query is ambiguous.
+    max_candidates = 5
+
+    def __init__(self, names: Iterable[str]):
+        self.names = list(dict.fromkeys(names))
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self._normalized: dict[str, str] = {}
+        self._tokens: list[list[str]] = []
+        self._trigrams: list[set[str]] = []
+        self._postings: defaultdict[str, list[int]] = defaultdict(list)
+        # The same for names with their category stripped, only for names that have one.
+        self._bare_trigrams: dict[int, set[str]] = {}
+        self._bare_postings: defaultdict[str, list[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            tokens = normalize(name)
+            text = " ".join(tokens)
+            self._normalized.setdefault(text, name)
+            self._tokens.append(tokens)
+            grams = trigrams(text)
+            self._trigrams.append(grams)
+            for gram in grams:
+                self._postings[gram].append(i)
+            bare = " ".join(normalize(CATEGORY.sub("", name)))
+            if bare and bare != text:
+                self._bare_trigrams[i] = trigrams(bare)
+                for gram in self._bare_trigrams[i]:
+                    self._bare_postings[gram].append(i)
+
+    def scores(self, query: str) -> list[tuple[float, str]]:
+        """
+        The similarity (0 to 1) of every name sharing a trigram with the query, best first.
+        """
+        tokens = normalize(query)
+        if not tokens:
+            return []
+        grams = trigrams(" ".join(tokens))
+        shared = Counter(
+            chain.from_iterable(self._postings.get(gram, ()) for gram in grams)
+        )
+        shared_bare = Counter(
+            chain.from_iterable(self._bare_postings.get(gram, ()) for gram in grams)
+        )
+        # A token starting with "xy" always gives its name the trigram " xy", so only names
+        # with all of those can start a token with every query token.
+        starts = [
+            set(self._postings.get(f" {q[:2]}", ())) for q in tokens if len(q) > 1
+        ]
+        prefixed = set.intersection(*starts) if starts else set(shared)
+
+        results: list[tuple[float, str]] = []
+        for i, count in shared.items():
+            # Jaccard similarity of the trigram sets, against the name with or without its
+            # category, whichever is closer.
+            score = count / (len(grams) + len(self._trigrams[i]) - count)
+            if i in shared_bare:
+                bare = shared_bare[i]
+                score = max(
+                    score, bare / (len(grams) + len(self._bare_trigrams[i]) - bare)
+                )
+            # Partial names rank above misspellings.
+            if i in prefixed and self._partial(tokens, i):
+                score = 0.5 + score / 2
+            results.append((score, self.names[i]))
+        results.sort(key=lambda r: (-r[0], r[1]))
+        return results
+
+    def _partial(self, tokens: list[str], i: int) -> bool:
+        # Whether every query token starts a token of the name ("rsa" for "<crypto> rsa-baby").
+        return all(any(t.startswith(q) for t in self._tokens[i]) for q in tokens)
+
+    def match(self, query: str) -> tuple[str | None, list[str]]:
+        """
+        Resolve a query to one of the names.
+
+        Returns
+        -------
+        tuple[str | None, list[str]]
+            The name and no candidates if there is a sure and clear match, no name and the
+            closest candidates if several names are about as close or a close name may be a
+            different one ("rsa-2" for "rsa-1"), or neither if nothing is close.
+        """
+        if query in self._positions:
+            return query, []
+        text = " ".join(normalize(query))
+        same = self._normalized.get(text)
+        if same is not None:
+            return same, []
+        if len(text) < 2:
+            # A single character says nothing about which name is meant.
+            return None, []
+        results = [r for r in self.scores(query) if r[0] >= self.min_score]
+        if not results:
+            return None, []
+        best_score, best = results[0]
+        sure = best_score >= self.sure_score or self._partial(
+            normalize(query), self._positions[best]
+        )
+        if sure and (
+            len(results) == 1 or best_score - results[1][0] >= self.clear_lead
+        ):
+            return best, []
+        return None, [name for _, name in results[: self.max_candidates]]
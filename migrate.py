@@ -0,0 +1,100 @@
+import sys
+from typing import Any
+
+import discord
+from colorama import Fore, Style
+from pymongo import UpdateOne
+
+import config_vars
+import database
+
+# One-shot migration from the old layout, one collection per guild in "ctfteams" and one
+# "<guild id>-CONF" collection per guild in "serverinfo", to the single ctfs_by_channel and
+# guild_config collections.
+# CTFs used to be stored by channel name, so the bot logs in to resolve each name to its channel id.
+#
+# Usage: python migrate.py [--drop]
+#   --drop  drop each old collection once everything in it has been migrated
+
+intents = discord.Intents.none()
+intents.guilds = True
+client = discord.Client(intents=intents)
+
+
+async def migrate_ctfs(drop: bool):
+    for coll_name in await config_vars.teamdb.list_collection_names():
+        if not coll_name.isdigit():
+            continue
+        guild = client.get_guild(int(coll_name))
+        if guild is None:
+            print(
+                Fore.RED + f"Guild {coll_name}: not found, skipping" + Style.RESET_ALL
+            )
+            continue
+
+        ops: list[UpdateOne] = []
+        missing: list[str] = []
+        async for doc in config_vars.teamdb[coll_name].find():
+            channel = discord.utils.get(guild.text_channels, name=doc.get("name"))
+            if channel is None:
+                missing.append(str(doc.get("name")))
+                continue
+            info: dict[str, Any] = {"name": doc["name"]}
+            for key in ("text_channel", "challenges"):
+                if key in doc:
+                    info[key] = doc[key]
+            ops.append(
+                UpdateOne(
+                    {"guild_id": guild.id, "channel_id": channel.id},
+                    {"$set": info},
+                    upsert=True,
+                )
+            )
+        if ops:
+            await config_vars.ctfs_by_channel.bulk_write(ops, ordered=False)
+        print(f"Guild {coll_name}: migrated {len(ops)} ctfs")
+        if missing:
+            print(
+                Fore.RED
+                + f"Guild {coll_name}: no channel for {', '.join(missing)}"
+                + Style.RESET_ALL
+            )
+        elif drop:
+            await config_vars.teamdb.drop_collection(coll_name)
+
+
+async def migrate_configs(drop: bool):
+    for coll_name in await config_vars.serverdb.list_collection_names():
+        guild_id = coll_name.removesuffix("-CONF")
+        if guild_id == coll_name or not guild_id.isdigit():
+            continue
+        info: dict[str, Any] = {}
+        async for doc in config_vars.serverdb[coll_name].find():
+            if doc.get("name") == "category_name" and "ctf_category" in doc:
+                info["ctf_category"] = doc["ctf_category"]
+            elif (
+                doc.get("name") == "archive_category_name" and "archive_category" in doc
+            ):
+                info["archive_category"] = doc["archive_category"]
+        if info:
+            await database.guild_configs.set(int(guild_id), info)
+        print(f"Guild {guild_id}: migrated config {info}")
+        if drop:
+            await config_vars.serverdb.drop_collection(coll_name)
+
+
+@client.event
+async def on_ready():
+    drop = "--drop" in sys.argv[1:]
+    try:
+        await database.teams.ensure_indexes()
+        await database.guild_configs.ensure_indexes()
+        await migrate_ctfs(drop)
+        await migrate_configs(drop)
+        print(Fore.GREEN + "Migration complete" + Style.RESET_ALL)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    client.run(config_vars.DISCORD_TOKEN)
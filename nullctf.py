@@ -7,7 +7,7 @@ from discord.ext import commands
 
 import cogs
 import config_vars
-from common import Context
+from common import Context, NullCTFBot
 
 intents = discord.Intents.none()
 intents.guilds = True
@@ -16,7 +16,7 @@ intents.guild_reactions = True
 intents.message_content = True
 intents.dm_messages = True
 
-bot = commands.Bot(
+bot = NullCTFBot(
     command_prefix=">",
     allowed_mentions=discord.AllowedMentions(everyone=False, users=False, roles=False),
     intents=intents,
@@ -246,6 +246,8 @@ async def on_command_error(ctx: Context, error: commands.CommandError):
         return
     elif isinstance(error, commands.MissingRequiredArgument):
         await ctx.send("Missing a required argument.  Do >help")
+    elif isinstance(error, commands.BadArgument):
+        await ctx.send(str(error))
     elif isinstance(error, commands.MissingPermissions):
         await ctx.send(
             "You do not have the appropriate permissions to run this command."
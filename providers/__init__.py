@@ -0,0 +1,108 @@
+import asyncio
+
+from cache import TTLCache
+from providers.base import (
+    Credentials,
+    InvalidCredentials,
+    InvalidProvider,
+    NonceNotFound,
+    Provider,
+    PullFailed,
+    PullResult,
+    SessionExpired,
+)
+from providers.ctfd import CTFd
+from providers.rctf import RCTF
+from web import WebClient
+
+# CTF platforms challenges can be pulled from.  To add one, implement providers.base.Provider
+# and add it to `available`.
+
+# Providers in the order they are preferred, when several detect the same CTF.
+available: list[type[Provider]] = [CTFd, RCTF]
+
+# The provider detected for each CTF url, so later pulls skip fingerprinting.
+DETECTION_TTL = 24 * 60 * 60
+detected: TTLCache[str, type[Provider]] = TTLCache(DETECTION_TTL)
+
+
+async def detect(web: WebClient, url: str) -> type[Provider]:
+    """
+    The provider of the CTF at `url`.
+
+    Raises
+    ------
+    InvalidProvider
+        If no provider recognizes the CTF.
+    PullFailed
+        If the CTF could not be reached.
+    """
+    url = url.rstrip("/")
+    provider = detected.get(url)
+    if provider is not None:
+        return provider
+    # Every provider fingerprints the site at once.
+    results = await asyncio.gather(
+        *(provider.detect(web, url) for provider in available), return_exceptions=True
+    )
+    for provider, result in zip(available, results):
+        if result is True:
+            detected.set(url, provider)
+            return provider
+    # A fingerprint that failed to load says nothing about the platform, so the CTF is only
+    # unsupported when every provider got an answer.
+    for result in results:
+        if isinstance(result, ValueError):  # e.g. aiohttp.InvalidURL
+            raise result
+        if isinstance(result, Exception):
+            raise PullFailed(f"Could not reach {url}, try again later.") from result
+    raise InvalidProvider(
+        f"Unsupported CTF platform, can only pull from {', '.join(p.name for p in available)}."
+    )
+
+
+async def pull(
+    web: WebClient,
+    url: str,
+    creds: Credentials,
+    session_key: tuple[int, int] | None = None,
+) -> PullResult:
+    """
+    Pull every challenge and its solve state from the CTF at `url`, whatever it runs on.
+
+    Parameters
+    ----------
+    web : WebClient
+        The client every request is made with.
+    url : str
+        The URL of the CTF.
+    creds : Credentials
+        The credentials set for the CTF.
+    session_key : tuple[int, int] | None
+        (guild id, channel id) of the pull, logins are cached per key when given.
+    """
+    provider = await detect(web, url)
+    try:
+        return await provider(web, url, session_key).pull(creds)
+    except InvalidProvider:
+        # The site changed platform since it was detected.
+        detected.pop(url.rstrip("/"))
+        raise
+
+
+__all__ = [
+    "Credentials",
+    "InvalidCredentials",
+    "InvalidProvider",
+    "NonceNotFound",
+    "Provider",
+    "PullFailed",
+    "PullResult",
+    "SessionExpired",
+    "CTFd",
+    "RCTF",
+    "available",
+    "detect",
+    "detected",
+    "pull",
+]
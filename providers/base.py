@@ -0,0 +1,160 @@
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from web import WebClient, WebResponse
+
+# The interface every CTF platform provider implements, see providers/__init__.py for the
+# list of providers.  Providers only talk to the platform through a WebClient, so they can
+# be pointed at a local stand-in server.
+
+
+class InvalidProvider(Exception):
+    pass
+
+
+class InvalidCredentials(Exception):
+    pass
+
+
+class NonceNotFound(Exception):
+    pass
+
+
+class PullFailed(Exception):
+    pass
+
+
+class SessionExpired(Exception):
+    # Raised by a provider when the platform rejects its authentication mid-pull.
+    pass
+
+
+@dataclass
+class Credentials:
+    # Either an access token, a username and password, or both.
+    username: str | None = None
+    password: str | None = None
+    token: str | None = None
+
+
+@dataclass
+class PullResult:
+    challenges: dict[str, str]
+    # Seconds spent in each phase of the pull, in the order they ran.
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def timing_summary(self) -> str:
+        return ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in self.timings.items())
+
+
+def json_or_none(r: WebResponse) -> Any:
+    try:
+        return r.json()
+    except ValueError:
+        return None
+
+
+class Provider(ABC):
+    """
+    A CTF platform challenges and solves can be pulled from.
+
+    Parameters
+    ----------
+    web : WebClient
+        The client every request is made with.
+    url : str
+        The base URL of the CTF.
+    session_key : tuple[int, int] | None
+        (guild id, channel id) of the pull, logins are cached per key when given.
+    """
+
+    # Shown to users, e.g. in the list of supported platforms.
+    name: str
+
+    def __init__(
+        self, web: WebClient, url: str, session_key: tuple[int, int] | None = None
+    ):
+        self.web = web
+        self.url = url.rstrip("/")
+        self.session_key = session_key
+        self.timings: dict[str, float] = {}
+
+    @classmethod
+    @abstractmethod
+    async def detect(cls, web: WebClient, url: str) -> bool:
+        """
+        Whether the CTF at `url` runs on this platform.
+        """
+
+    @abstractmethod
+    async def authenticate(self, creds: Credentials, retry: bool) -> bool:
+        """
+        Get ready to make authenticated requests.
+
+        Parameters
+        ----------
+        creds : Credentials
+            The credentials set for the CTF.
+        retry : bool
+            Set when the previous authentication was rejected with SessionExpired.
+
+        Returns
+        -------
+        bool
+            Whether authenticating again could still succeed if this one is rejected.
+        """
+
+    @abstractmethod
+    async def challenges(self) -> list[tuple[str, str]]:
+        """
+        The (category, name) of every challenge.
+        """
+
+    @abstractmethod
+    async def solves(self) -> set[tuple[str, str]]:
+        """
+        The (category, name) of every challenge solved by the user or their team.
+        """
+
+    @contextmanager
+    def timed(self, phase: str):
+        phase_start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = (
+                self.timings.get(phase, 0) + perf_counter() - phase_start
+            )
+
+    async def pull(self, creds: Credentials) -> PullResult:
+        """
+        Every challenge and whether it is solved, named "<category> name".
+        """
+        retry = False
+        while True:
+            can_retry = await self.authenticate(creds, retry)
+            try:
+                with self.timed("fetch"):
+                    challenges, solves = await asyncio.gather(
+                        self.challenges(), self.solves()
+                    )
+                break
+            except SessionExpired:
+                if not can_retry:
+                    raise InvalidCredentials(
+                        f"{self.name} did not accept the credentials"
+                    )
+                retry = True
+
+        with self.timed("process"):
+            result = {
+                f"<{category}> {name}": (
+                    "Solved" if (category, name) in solves else "Unsolved"
+                )
+                for category, name in challenges
+            }
+        return PullResult(result, self.timings)
@@ -0,0 +1,173 @@
+import asyncio
+from dataclasses import dataclass
+
+from cache import TTLCache
+from providers.base import (
+    Credentials,
+    InvalidCredentials,
+    InvalidProvider,
+    NonceNotFound,
+    Provider,
+    PullFailed,
+    SessionExpired,
+    json_or_none,
+)
+from web import WebClient, WebResponse
+
+# CTFd (https://ctfd.io), the most common CTF platform.
+
+
+@dataclass
+class CTFdSession:
+    username: str
+    password: str
+    cookies: dict[str, str]
+
+
+# Logged in CTFd sessions keyed by (guild id, channel id, CTFd url), so repeated pulls skip the login.
+SESSION_TTL = 60 * 60
+ctfd_sessions: TTLCache[tuple[int, int, str], CTFdSession] = TTLCache(SESSION_TTL)
+
+
+async def ctfdLogin(web: WebClient, url: str, username: str, password: str):
+    # Log in to CTFd with the provided credentials, returning the session cookies.
+    r = await web.get(f"{url}/login")
+    cookies = r.cookies
+    # Get the nonce from the login page.
+    try:
+        nonce = r.text.split("csrfNonce': \"")[1].split('"')[0]
+    except:  # sometimes errors happen here, my theory is that it is different versions of CTFd
+        try:
+            nonce = r.text.split('name="nonce" value="')[1].split('">')[0]
+        except:
+            raise NonceNotFound(
+                "Was not able to find the nonce token from login, please >report this along with the ctf url."
+            )
+    # Login with the username, password, and nonce
+    # The session cookie is set on the redirect, so it must not be followed.
+    r = await web.post(
+        f"{url}/login",
+        data={"name": username, "password": password, "nonce": nonce},
+        cookies=cookies,
+        allow_redirects=False,
+        retries=0,
+    )
+    if "Your username or password is incorrect" in r.text:
+        raise InvalidCredentials("Invalid login credentials")
+    cookies.update(r.cookies)
+    return cookies
+
+
+def session_expired(r: WebResponse) -> bool:
+    # CTFd either rejects the request or redirects to the login page once the session is gone.
+    return r.status in (401, 403) or "/login" in r.url
+
+
+class CTFd(Provider):
+    """
+    Pulls from CTFd's JSON API, with an access token or else a (cached) login session.
+    """
+
+    name = "CTFd"
+
+    def __init__(
+        self, web: WebClient, url: str, session_key: tuple[int, int] | None = None
+    ):
+        super().__init__(web, url, session_key)
+        self.cookies: dict[str, str] | None = None
+        self.headers: dict[str, str] | None = None
+        # The ways left to authenticate, tried in order whenever the last one is rejected.
+        self._methods: list[str] = []
+
+    @classmethod
+    async def detect(cls, web: WebClient, url: str) -> bool:
+        fingerprint = "Powered by CTFd"
+        r = await web.get(f"{url.rstrip('/')}/login")
+        return fingerprint in r.text
+
+    @property
+    def _key(self) -> tuple[int, int, str] | None:
+        return (*self.session_key, self.url) if self.session_key else None
+
+    async def authenticate(self, creds: Credentials, retry: bool) -> bool:
+        key = self._key
+        if not retry:
+            self._methods = []
+            if creds.token:
+                self._methods.append("token")
+            if creds.username is not None and creds.password is not None:
+                session = ctfd_sessions.get(key) if key else None
+                if session and (session.username, session.password) == (
+                    creds.username,
+                    creds.password,
+                ):
+                    self._methods.append("session")
+                self._methods.append("login")
+        if not self._methods:
+            raise InvalidCredentials("No credentials set")
+
+        method = self._methods.pop(0)
+        self.cookies, self.headers = None, None
+        if method == "token":
+            # Straight to the JSON API, no login page involved.
+            self.headers = {
+                "Authorization": f"Token {creds.token}",
+                # CTFd only accepts tokens on JSON requests.
+                "Content-Type": "application/json",
+            }
+        elif method == "session":
+            session = ctfd_sessions.get(key) if key else None
+            self.cookies = session.cookies if session else {}
+        else:
+            assert creds.username is not None and creds.password is not None
+            with self.timed("login"):
+                try:
+                    cookies = await ctfdLogin(
+                        self.web, self.url, creds.username, creds.password
+                    )
+                except InvalidCredentials:
+                    if key:
+                        ctfd_sessions.pop(key)
+                    raise
+            self.cookies = cookies
+            if key:
+                ctfd_sessions.set(
+                    key, CTFdSession(creds.username, creds.password, cookies)
+                )
+        return bool(self._methods)
+
+    async def _get(self, path: str) -> WebResponse:
+        return await self.web.get(
+            f"{self.url}{path}", cookies=self.cookies, headers=self.headers
+        )
+
+    async def challenges(self) -> list[tuple[str, str]]:
+        r = await self._get("/api/v1/challenges")
+        # Public challenge lists don't need a login, so only a rejection means it expired.
+        if session_expired(r):
+            raise SessionExpired
+        all_challenges = json_or_none(r)
+        if not isinstance(all_challenges, dict):
+            raise InvalidProvider("CTF is not based on CTFd, cannot pull challenges.")
+        if all_challenges.get("success") != True:
+            raise PullFailed("Error making request")
+        return [(chal["category"], chal["name"]) for chal in all_challenges["data"]]
+
+    async def solves(self) -> set[tuple[str, str]]:
+        # ctf may be user based.  There is a flag on CTFd for this (userMode), but it is not present in all versions,
+        # so whichever solve endpoint succeeds is used.
+        r_team_solves, r_user_solves = await asyncio.gather(
+            self._get("/api/v1/teams/me/solves"), self._get("/api/v1/users/me/solves")
+        )
+        # A logged in user always sees one of their solve lists.
+        if session_expired(r_team_solves) and session_expired(r_user_solves):
+            raise SessionExpired
+        team_solves = json_or_none(r_team_solves)
+        if not isinstance(team_solves, dict) or "success" not in team_solves:
+            team_solves = json_or_none(r_user_solves)
+
+        solves: set[tuple[str, str]] = set()
+        if isinstance(team_solves, dict) and team_solves.get("success") == True:
+            for solve in team_solves["data"]:
+                solves.add((solve["challenge"]["category"], solve["challenge"]["name"]))
+        return solves
@@ -0,0 +1,91 @@
+from urllib.parse import parse_qs, urlparse
+
+from cache import TTLCache
+from providers.base import (
+    Credentials,
+    InvalidCredentials,
+    Provider,
+    PullFailed,
+    SessionExpired,
+    json_or_none,
+)
+from web import WebClient, WebResponse
+
+# rCTF (https://rctf.redpwn.net), logged in to with a team token.
+# Every API response is a JSON object with a "kind" telling what happened, e.g. "goodLogin".
+
+
+# Auth tokens keyed by (guild id, channel id, rCTF url, team token), so repeated pulls skip the login.
+AUTH_TTL = 60 * 60
+rctf_auth_tokens: TTLCache[tuple[int, int, str, str], str] = TTLCache(AUTH_TTL)
+
+
+def team_token(token: str) -> str:
+    # The token on its own, or the team's login link (https://rctf.url/login?token=...).
+    if "://" in token:
+        return parse_qs(urlparse(token).query).get("token", [token])[0]
+    return token
+
+
+class RCTF(Provider):
+    """
+    Pulls from rCTF's API with a team token, set as the access token with setcreds.
+    """
+
+    name = "rCTF"
+
+    def __init__(
+        self, web: WebClient, url: str, session_key: tuple[int, int] | None = None
+    ):
+        super().__init__(web, url, session_key)
+        self.headers: dict[str, str] = {}
+
+    @classmethod
+    async def detect(cls, web: WebClient, url: str) -> bool:
+        # Without a token this is rejected, but still in rCTF's own format.
+        r = await web.get(f"{url.rstrip('/')}/api/v1/users/me")
+        data = json_or_none(r)
+        return isinstance(data, dict) and "kind" in data
+
+    async def authenticate(self, creds: Credentials, retry: bool) -> bool:
+        if not creds.token:
+            raise InvalidCredentials(
+                'rCTF needs a team token, set it with `>ctf setcreds "team token"`'
+            )
+        token = team_token(creds.token)
+        key = (*self.session_key, self.url, token) if self.session_key else None
+        auth_token = rctf_auth_tokens.get(key) if key and not retry else None
+        cached = auth_token is not None
+        if auth_token is None:
+            with self.timed("login"):
+                r = await self.web.post(
+                    f"{self.url}/api/v1/auth/login", json={"teamToken": token}
+                )
+            login = json_or_none(r)
+            if not isinstance(login, dict) or login.get("kind") != "goodLogin":
+                raise InvalidCredentials("Invalid team token")
+            auth_token = login["data"]["authToken"]
+            if key:
+                rctf_auth_tokens.set(key, auth_token)
+        self.headers = {"Authorization": f"Bearer {auth_token}"}
+        # A cached auth token can have been revoked, a fresh one is never retried.
+        return cached
+
+    async def _get(self, path: str, kind: str) -> dict:
+        r: WebResponse = await self.web.get(f"{self.url}{path}", headers=self.headers)
+        data = json_or_none(r)
+        if not isinstance(data, dict):
+            raise PullFailed("Error making request")
+        if data.get("kind") == "badToken":
+            raise SessionExpired
+        if data.get("kind") != kind:
+            raise PullFailed(data.get("message", "Error making request"))
+        return data
+
+    async def challenges(self) -> list[tuple[str, str]]:
+        data = await self._get("/api/v1/challs", "goodChallenges")
+        return [(chal["category"], chal["name"]) for chal in data["data"]]
+
+    async def solves(self) -> set[tuple[str, str]]:
+        data = await self._get("/api/v1/users/me", "goodUserData")
+        return {(solve["category"], solve["name"]) for solve in data["data"]["solves"]}
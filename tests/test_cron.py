@@ -0,0 +1,36 @@
+import unittest
+from datetime import UTC, datetime
+
+from cron import CronSchedule
+
+# Announcement schedules, which are stored per guild so bad ones must be rejected up front.
+
+
+class CronScheduleTest(unittest.TestCase):
+    def test_next_fire(self):
+        # Fridays at 18:00 in Asia/Kolkata (UTC+5:30), from a Wednesday.
+        schedule = CronSchedule("0 18 * * 5", "Asia/Kolkata")
+        self.assertEqual(
+            schedule.next_fire(datetime(2025, 1, 1, tzinfo=UTC)),
+            datetime(2025, 1, 3, 12, 30, tzinfo=UTC),
+        )
+
+    def test_invalid(self):
+        for expression, timezone, error in [
+            ("0 18 * *", "UTC", "5 fields"),
+            ("60 * * * *", "UTC", "out of range"),
+            ("5/0 * * * *", "UTC", "at least 1"),
+            ("0 18 * * 5", "Mars/Olympus", "not a known timezone"),
+        ]:
+            with self.subTest(expression=expression, timezone=timezone):
+                with self.assertRaisesRegex(ValueError, error):
+                    CronSchedule(expression, timezone)
+
+    def test_never_fires(self):
+        schedule = CronSchedule("0 0 31 2 *")
+        with self.assertRaisesRegex(ValueError, "never matches"):
+            schedule.next_fire(datetime(2025, 1, 1, tzinfo=UTC))
+
+
+if __name__ == "__main__":
+    unittest.main()
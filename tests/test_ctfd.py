@@ -0,0 +1,163 @@
+import unittest
+from itertools import count
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from providers import CTFd, Credentials, InvalidCredentials
+from web import WebClient
+
+# CTFd pulls against a local stand-in of the parts of CTFd the provider uses.
+
+CHALLENGES = [
+    {"id": 1, "category": "web", "name": "baby web"},
+    {"id": 2, "category": "pwn", "name": "heap heaven"},
+    {"id": 3, "category": "crypto", "name": "rsa-baby"},
+]
+SOLVED = [CHALLENGES[1]]
+
+
+class StandInCTFd:
+    def __init__(self, user_mode: bool = False):
+        self.user_mode = user_mode
+        self.username, self.password, self.token = "alice", "hunter2", "ctfd_0123abcd"
+        self.sessions: set[str] = set()
+        self.session_ids = count()
+        self.logins = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/login", self.login_page)
+        app.router.add_post("/login", self.login)
+        app.router.add_get("/api/v1/challenges", self.challenges)
+        app.router.add_get("/api/v1/teams/me/solves", self.team_solves)
+        app.router.add_get("/api/v1/users/me/solves", self.user_solves)
+        return app
+
+    def authorized(self, request: web.Request) -> bool:
+        if request.headers.get("Authorization") == f"Token {self.token}":
+            # CTFd only accepts tokens on JSON requests.
+            return request.headers.get("Content-Type") == "application/json"
+        return request.cookies.get("session") in self.sessions
+
+    async def login_page(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text="<script>var init = {'csrfNonce': \"n0nce\"}</script>Powered by CTFd",
+            content_type="text/html",
+        )
+
+    async def login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if (form.get("name"), form.get("password"), form.get("nonce")) != (
+            self.username,
+            self.password,
+            "n0nce",
+        ):
+            return web.Response(text="Your username or password is incorrect")
+        self.logins += 1
+        session = f"session-{next(self.session_ids)}"
+        self.sessions.add(session)
+        # The session cookie is set on the redirect after logging in, like CTFd does.
+        r = web.Response(status=302, headers={"Location": "/challenges"})
+        r.set_cookie("session", session)
+        return r
+
+    def json(self, request: web.Request, data: list) -> web.Response:
+        if not self.authorized(request):
+            raise web.HTTPFound("/login?next=/challenges")
+        return web.json_response({"success": True, "data": data})
+
+    async def challenges(self, request: web.Request) -> web.Response:
+        return self.json(request, CHALLENGES)
+
+    async def team_solves(self, request: web.Request) -> web.Response:
+        if self.user_mode:
+            return web.json_response({"message": "not found"}, status=404)
+        return self.json(request, [{"challenge": chal} for chal in SOLVED])
+
+    async def user_solves(self, request: web.Request) -> web.Response:
+        if not self.user_mode:
+            return web.json_response({"success": False, "data": []})
+        return self.json(request, [{"challenge": chal} for chal in SOLVED])
+
+
+class CTFdTest(unittest.IsolatedAsyncioTestCase):
+    user_mode = False
+
+    async def asyncSetUp(self):
+        self.ctfd = StandInCTFd(self.user_mode)
+        self.server = TestServer(self.ctfd.app())
+        await self.server.start_server()
+        # The port differs between tests, so nothing cached by the url leaks across them.
+        self.url = str(self.server.make_url("/"))
+        self.web = WebClient(retries=0, timeout=5)
+
+    async def asyncTearDown(self):
+        await self.web.close()
+        await self.server.close()
+
+    async def pull(self, creds: Credentials, session_key=(1, 2)) -> dict[str, str]:
+        result = await CTFd(self.web, self.url, session_key).pull(creds)
+        return result.challenges
+
+    def assertPulled(self, challenges: dict[str, str]):
+        self.assertEqual(
+            challenges,
+            {
+                "<web> baby web": "Unsolved",
+                "<pwn> heap heaven": "Solved",
+                "<crypto> rsa-baby": "Unsolved",
+            },
+        )
+
+    async def test_detect(self):
+        self.assertTrue(await CTFd.detect(self.web, self.url))
+
+    async def test_password(self):
+        self.assertPulled(await self.pull(Credentials("alice", "hunter2")))
+        self.assertEqual(self.ctfd.logins, 1)
+
+    async def test_cached_session(self):
+        await self.pull(Credentials("alice", "hunter2"))
+        self.assertPulled(await self.pull(Credentials("alice", "hunter2")))
+        self.assertEqual(self.ctfd.logins, 1)
+
+    async def test_expired_session(self):
+        await self.pull(Credentials("alice", "hunter2"))
+        self.ctfd.sessions.clear()
+        self.assertPulled(await self.pull(Credentials("alice", "hunter2")))
+        self.assertEqual(self.ctfd.logins, 2)
+
+    async def test_sessions_per_channel(self):
+        await self.pull(Credentials("alice", "hunter2"), session_key=(1, 2))
+        await self.pull(Credentials("alice", "hunter2"), session_key=(1, 3))
+        self.assertEqual(self.ctfd.logins, 2)
+
+    async def test_token(self):
+        self.assertPulled(await self.pull(Credentials(token="ctfd_0123abcd")))
+        self.assertEqual(self.ctfd.logins, 0)
+
+    async def test_bad_token_falls_back_to_login(self):
+        creds = Credentials("alice", "hunter2", "ctfd_wrong")
+        self.assertPulled(await self.pull(creds))
+        self.assertEqual(self.ctfd.logins, 1)
+
+    async def test_bad_token(self):
+        with self.assertRaises(InvalidCredentials):
+            await self.pull(Credentials(token="ctfd_wrong"))
+
+    async def test_bad_password(self):
+        with self.assertRaises(InvalidCredentials):
+            await self.pull(Credentials("alice", "wrong"))
+
+    async def test_no_credentials(self):
+        with self.assertRaises(InvalidCredentials):
+            await self.pull(Credentials())
+
+
+class UserModeCTFdTest(CTFdTest):
+    user_mode = True
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from fuzzy import NameIndex
+
+# Resolving typed challenge names, which must never silently pick a different challenge.
+
+
+class NameIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(
+            [
+                "<crypto> rsa-1",
+                "<crypto> rsa-baby",
+                "<pwn> baby-heap",
+                "<pwn> heap heaven",
+                "<forensics> memory dump",
+                "<misc> core dump",
+                "<web> login",
+            ]
+        )
+
+    def test_exact(self):
+        self.assertEqual(self.index.match("<web> login"), ("<web> login", []))
+        # Case, punctuation and the category's brackets don't matter.
+        self.assertEqual(self.index.match("PWN Baby Heap"), ("<pwn> baby-heap", []))
+
+    def test_partial(self):
+        self.assertEqual(self.index.match("login"), ("<web> login", []))
+        self.assertEqual(self.index.match("heap heav"), ("<pwn> heap heaven", []))
+
+    def test_close_typo(self):
+        self.assertEqual(self.index.match("heap heven"), ("<pwn> heap heaven", []))
+
+    def test_near_but_distinct(self):
+        # Names close to a different challenge are only offered, never picked.
+        for query, candidate in [
+            ("rsa-2", "<crypto> rsa-1"),
+            ("baby-rop", "<pwn> baby-heap"),
+            ("pwn 2", "<pwn> baby-heap"),
+            ("memroy dump", "<forensics> memory dump"),
+            ("logn", "<web> login"),
+        ]:
+            with self.subTest(query=query):
+                match, candidates = self.index.match(query)
+                self.assertIsNone(match)
+                self.assertIn(candidate, candidates)
+
+    def test_ambiguous(self):
+        match, candidates = self.index.match("dump")
+        self.assertIsNone(match)
+        self.assertEqual(
+            set(candidates), {"<misc> core dump", "<forensics> memory dump"}
+        )
+
+    def test_unrelated(self):
+        self.assertEqual(self.index.match("xyzzy"), (None, []))
+        self.assertEqual(self.index.match("r"), (None, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import socket
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import providers
+from providers import CTFd, InvalidProvider, PullFailed, RCTF
+from tests.test_ctfd import StandInCTFd
+from tests.test_rctf import StandInRCTF
+from web import WebClient
+
+# Detecting which provider a CTF runs on.
+
+
+async def not_a_ctf(request: web.Request) -> web.Response:
+    return web.Response(text="<h1>Just a blog</h1>", content_type="text/html")
+
+
+class DetectTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.web = WebClient(retries=0, timeout=5)
+        self.servers: list[TestServer] = []
+
+    async def asyncTearDown(self):
+        await self.web.close()
+        for server in self.servers:
+            await server.close()
+
+    async def serve(self, app: web.Application) -> str:
+        server = TestServer(app)
+        await server.start_server()
+        self.servers.append(server)
+        return str(server.make_url("/"))
+
+    async def test_ctfd(self):
+        url = await self.serve(StandInCTFd().app())
+        self.assertIs(await providers.detect(self.web, url), CTFd)
+        # Cached by the url, without its trailing slash.
+        self.assertIs(providers.detected.get(url.rstrip("/")), CTFd)
+
+    async def test_rctf(self):
+        url = await self.serve(StandInRCTF().app())
+        self.assertIs(await providers.detect(self.web, url), RCTF)
+
+    async def test_unsupported(self):
+        app = web.Application()
+        app.router.add_get("/{path:.*}", not_a_ctf)
+        url = await self.serve(app)
+        with self.assertRaises(InvalidProvider):
+            await providers.detect(self.web, url)
+
+    async def test_unreachable(self):
+        # A port nothing listens on.
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        with self.assertRaises(PullFailed):
+            await providers.detect(self.web, f"http://127.0.0.1:{port}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from itertools import count
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from providers import RCTF, Credentials, InvalidCredentials
+from web import WebClient
+
+# rCTF pulls against a local stand-in of the parts of rCTF's API the provider uses.
+
+CHALLENGES = [
+    {"id": "baby-web", "category": "web", "name": "baby web"},
+    {"id": "heap-heaven", "category": "pwn", "name": "heap heaven"},
+]
+SOLVED = [CHALLENGES[1]]
+
+
+class StandInRCTF:
+    def __init__(self):
+        self.team_token = "team-token"
+        self.auth_tokens: set[str] = set()
+        self.token_ids = count()
+        self.logins = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/v1/auth/login", self.login)
+        app.router.add_get("/api/v1/challs", self.challenges)
+        app.router.add_get("/api/v1/users/me", self.me)
+        return app
+
+    async def login(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if body.get("teamToken") != self.team_token:
+            return web.json_response(
+                {"kind": "badTokenVerification", "message": "Invalid token."},
+                status=401,
+            )
+        self.logins += 1
+        auth_token = f"auth-{next(self.token_ids)}"
+        self.auth_tokens.add(auth_token)
+        return web.json_response(
+            {"kind": "goodLogin", "message": "ok", "data": {"authToken": auth_token}}
+        )
+
+    def authorized(self, request: web.Request) -> bool:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        return scheme == "Bearer" and token in self.auth_tokens
+
+    def reply(self, request: web.Request, kind: str, data: object) -> web.Response:
+        if not self.authorized(request):
+            return web.json_response(
+                {"kind": "badToken", "message": "Invalid token."}, status=401
+            )
+        return web.json_response({"kind": kind, "message": "ok", "data": data})
+
+    async def challenges(self, request: web.Request) -> web.Response:
+        return self.reply(request, "goodChallenges", CHALLENGES)
+
+    async def me(self, request: web.Request) -> web.Response:
+        return self.reply(request, "goodUserData", {"name": "team", "solves": SOLVED})
+
+
+class RCTFTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.rctf = StandInRCTF()
+        self.server = TestServer(self.rctf.app())
+        await self.server.start_server()
+        # The port differs between tests, so nothing cached by the url leaks across them.
+        self.url = str(self.server.make_url("/"))
+        self.web = WebClient(retries=0, timeout=5)
+
+    async def asyncTearDown(self):
+        await self.web.close()
+        await self.server.close()
+
+    async def pull(self, creds: Credentials) -> dict[str, str]:
+        result = await RCTF(self.web, self.url, (1, 2)).pull(creds)
+        return result.challenges
+
+    def assertPulled(self, challenges: dict[str, str]):
+        self.assertEqual(
+            challenges, {"<web> baby web": "Unsolved", "<pwn> heap heaven": "Solved"}
+        )
+
+    async def test_detect(self):
+        self.assertTrue(await RCTF.detect(self.web, self.url))
+
+    async def test_team_token(self):
+        self.assertPulled(await self.pull(Credentials(token="team-token")))
+        self.assertEqual(self.rctf.logins, 1)
+
+    async def test_login_link(self):
+        creds = Credentials(token=f"{self.url}login?token=team-token")
+        self.assertPulled(await self.pull(creds))
+
+    async def test_cached_auth_token(self):
+        await self.pull(Credentials(token="team-token"))
+        self.assertPulled(await self.pull(Credentials(token="team-token")))
+        self.assertEqual(self.rctf.logins, 1)
+
+    async def test_revoked_auth_token(self):
+        await self.pull(Credentials(token="team-token"))
+        self.rctf.auth_tokens.clear()
+        self.assertPulled(await self.pull(Credentials(token="team-token")))
+        self.assertEqual(self.rctf.logins, 2)
+
+    async def test_bad_team_token(self):
+        with self.assertRaises(InvalidCredentials):
+            await self.pull(Credentials(token="wrong"))
+
+    async def test_no_team_token(self):
+        with self.assertRaises(InvalidCredentials):
+            await self.pull(Credentials("alice", "hunter2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+import aiohttp
+from multidict import CIMultiDictProxy
+
+# A single pooled HTTP client shared by every cog (owned by the bot, see common.NullCTFBot).
+# Connections are kept alive between requests, and transient failures are retried with
+# exponential backoff so a slow remote site never blocks the event loop.
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:61.0) Gecko/20100101 Firefox/61.0"
+)
+
+# Status codes worth retrying, everything else is handed back to the caller.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class WebResponse:
+    status: int
+    url: str
+    headers: CIMultiDictProxy[str]
+    cookies: dict[str, str]
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class WebClient:
+    """
+    Shared aiohttp session with keep-alive pooling, timeouts and retries.
+
+    Parameters
+    ----------
+    limit : int
+        The maximum number of open connections.
+    limit_per_host : int
+        The maximum number of open connections to a single host.
+    timeout : float
+        The total timeout of a single attempt, in seconds.
+    retries : int
+        The default number of retries for a request.
+    backoff : float
+        The base delay between retries, doubled on every attempt.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        timeout: float = 15.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        # Cookies are never stored on the shared session, they belong to whoever made the
+        # request (e.g. a CTFd login for one channel) and are passed explicitly instead.
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=limit, limit_per_host=limit_per_host, ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            headers={"User-Agent": USER_AGENT},
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+
+    async def close(self):
+        await self._session.close()
+
+    def _delay(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), 60.0)
+        return self.backoff * 2**attempt + random.uniform(0, self.backoff)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        cookies: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+        retries: int | None = None,
+        **kwargs: Any,
+    ) -> WebResponse:
+        """
+        Make a request and read the whole response.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL to request.
+        cookies : Mapping[str, str] | None
+            Cookies to send with this request only.
+        headers : Mapping[str, str] | None
+            Extra headers to send with this request.
+        retries : int | None
+            How many times to retry on connection errors and retryable statuses,
+            defaults to the client's setting.
+        """
+        retries = self.retries if retries is None else retries
+        headers = dict(headers or {})
+        if cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+
+        attempt = 0
+        while True:
+            try:
+                async with self._session.request(
+                    method, url, headers=headers, **kwargs
+                ) as r:
+                    body = await r.read()
+                    response = WebResponse(
+                        status=r.status,
+                        url=str(r.url),
+                        headers=r.headers,
+                        cookies={k: v.value for k, v in r.cookies.items()},
+                        body=body,
+                    )
+                if response.status not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                delay = self._delay(attempt, response.headers.get("Retry-After"))
+            except aiohttp.InvalidURL:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+                delay = self._delay(attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> WebResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> WebResponse:
+        return await self.request("POST", url, **kwargs)